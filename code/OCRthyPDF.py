@@ -112,7 +112,8 @@ for f in licenses:
 # 'background', temporarilyy diabled since ocrmypdf v13.0.0
 stringOptions = ['ocr', 'noise', 'optimization', 'postfix', 'standard', 'confidence','userwordsfilename', 
                  'deskew', 'rotate', 'sidecar', 'runsplitter', 'tess-thresholding', 'savesplittext',
-                 'separator', 'separatorpage', 'usesourcename', 'loglevel', 'areafactor']
+                 'separator', 'separatorpage', 'usesourcename', 'loglevel', 'areafactor', 'searchcorner',
+                 'splitmode', 'symbologies']
 
 pathOptions = ['filename','infolder','outfolder']
 
@@ -320,13 +321,35 @@ def startSplitJob (filename, Job):
     if tmpOptions['opt_separatorpage'] == 'Sticker Mode':
         args = args + '--sticker-mode '
 
+    # Separator code type and barcode symbologies
+    if tmpOptions['opt_splitmode'] == 'Barcode':
+        args = args + '-m BARCODE '
+        symbologies = tmpOptions['opt_symbologies'].replace(' ', '')
+        if len(symbologies)>0:
+            args = args + "--symbologies '" + symbologies + "' "
+    elif tmpOptions['opt_splitmode'] == 'Patch code':
+        # Separator is a list of patch codes, NEXT means patch T and patch 2
+        args = args + '-m PATCH '
+    elif tmpOptions['opt_splitmode'] == 'Blank page':
+        args = args + '-m BLANK '
+    elif tmpOptions['opt_splitmode'] == 'QR code or text':
+        args = args + '-m ANY '
+
     # DEPRECATED: Assemble split parts from repaired PDF
     '''
     if tmpOptions['opt_repair'] == 'yes':
         args = args + '-r '    
     '''
     
-    args = args + '-af ' + tmpOptions['opt_areafactor'] + ' '
+    # Search area: Corner of the page and size
+    areaFactor = float(tmpOptions['opt_areafactor'])
+    left, top = {
+        'Upper left': (0, 0),
+        'Upper right': (1 - areaFactor, 0),
+        'Lower left': (0, 1 - areaFactor),
+        'Lower right': (1 - areaFactor, 1 - areaFactor)
+    }.get(tmpOptions['opt_searchcorner'], (0, 0))
+    args = args + '-r %g,%g,%g,%g ' % (left, top, left + areaFactor, top + areaFactor)
     
     # Loglevel
     args = args + "--log " + tmpOptions['opt_loglevel'] + " "
@@ -542,9 +565,12 @@ tab2_layout =   [
                     [sg.T('It replaces the index numbers -> You need to provide different postfixes for all files.')],
                     [sg.T('Run splitter after OCR:'),sg.InputCombo(('yes', 'no'), default_value='no', key='opt_runsplitter', enable_events = True)],
                     [sg.T('Separator code (add at least this to your QR code):'), sg.In('NEXT', key='opt_separator', change_submits = True, size = (15,1), enable_events = True)],
+                    [sg.T('Separator code type:'), sg.InputCombo(('QR code', 'Barcode', 'Patch code', 'Blank page', 'QR code or text'), default_value='QR code', key='opt_splitmode', tooltip='QR code or text: Pages that contain the separator text or a QR code with the separator.\nPatch code: Kodak patch code sheets. Enter the patch codes used as separator, e.g. T,2\nThe default separator NEXT accepts patch T and patch 2.\nBlank page: Blank sheets separate the documents. The separator code is ignored.', enable_events = True)],
+                    [sg.T('Barcode types (empty = all):'), sg.In('CODE128', key='opt_symbologies', change_submits = True, size = (15,1), tooltip='Comma separated list of barcode types used for separators, e.g. CODE128,CODE39.\nEvery additional type slows down splitting and may match product barcodes.\nOnly used if the separator code type is Barcode.', enable_events = True)],
                     [sg.T('Separator mode?:'), sg.InputCombo(('Drop separator page', 'Sticker Mode'), default_value='Drop separator page', key='opt_separatorpage', tooltip='Sticker Mode: QR Code starts new segment. Page is added to output.', enable_events = True)],                  
                     [sg.T('Use source filename in output filename?:'),sg.InputCombo(('yes', 'no'), default_value='yes', key='opt_usesourcename', enable_events = True)],
                     [sg.T('Limit QR-code search area:'),sg.InputCombo(('1.0','0.5','0.25'), default_value='1', key='opt_areafactor', tooltip='Default: 1.0 - Multiply width and height with this factor to\nlimit the search area and speed up splitting.\n1 = Whole image(page)\n0.5 = Upper left quadrant\n0.25 = Upper left quadrant of upper left quadrant', enable_events = True)],
+                    [sg.T('Search area corner:'),sg.InputCombo(('Upper left', 'Upper right', 'Lower left', 'Lower right'), default_value='Upper left', key='opt_searchcorner', tooltip='Corner of the page where the limited search area is placed.\nSelect the corner where you put your separator stickers.', enable_events = True)],
                     [sg.T('Save text as separate .txt files:'),sg.InputCombo(('yes', 'no'), default_value='no', key='opt_savesplittext', enable_events = True)]                        
                 ]                   
 
@@ -7,91 +7,992 @@ import subprocess
 import shlex
 import sys
 import time
+import threading
+import weakref
+import resource
+import hashlib
+import json
 import concurrent.futures
+import operator
 import pdftotext
-from pyzbar.pyzbar import decode, ZBarSymbol
+import numpy as np
+from pyzbar.pyzbar import decode, ZBarSymbol, PyZbarError
+try:
+    # Internals of pyzbar 0.1.9 for persistent scanners, decode is used if they change
+    from pyzbar.pyzbar import _pixel_data, _symbols_for_image, _decode_symbols, _FOURCC
+    from pyzbar.wrapper import (ZBarConfig, zbar_image_scanner_create, zbar_image_scanner_destroy, zbar_image_scanner_set_config, 
+                                zbar_image_create, zbar_image_destroy, zbar_image_set_format, zbar_image_set_size, zbar_image_set_data, zbar_scan_image)
+    persistentScanners = True
+except ImportError as error:
+    logging.debug('Persistent zbar scanners are not available, --scan-density is ignored: %s' % error)
+    persistentScanners = False
+from ctypes import cast, c_void_p
 from tempfile import TemporaryDirectory
-from pikepdf import Pdf, PdfImage, PdfError, _cpphelpers 
-from os import path
+from pikepdf import Pdf, PdfImage, PdfError, Dictionary, _cpphelpers, parse_content_stream
+from PIL import Image
+from io import BytesIO
+from functools import reduce
+from collections import namedtuple
+from os import path, replace, walk
 from multiprocessing import cpu_count
-from shutil import copy2
+from shutil import copy2, which
 
-def searchPDF (PDFfile, separator):
+def searchTextTask(PDFfile, pageRange, separator):
+    '''Worker entry point: Return the page numbers in pageRange whose text contains separator'''
+    pdfAsText = workerText(PDFfile)
+    separatorPages = []
+    for pageNumber in pageRange:
+        logging.debug('Searching for separator on page: %d'% (pageNumber+1)) 
+        if str(pdfAsText[pageNumber]).find(separator) != -1:
+            separatorPages.append(pageNumber)
+    return separatorPages
+
+def searchPDF (PDFfile, separator, max_workers=1, executorType='process', window=0, onConfirmed=None):
+    '''Search the text layer of PDFfile for separator. Workers search ranges of pages, each worker loads 
+    the text layer once. If window > 0 no more than about window pages are queued at any time. 
+    onConfirmed(separatorPages, confirmedPages) is called whenever all pages before page number 
+    confirmedPages have been searched.'''
+    startAnalysisTime = time.time()
+    separatorPages={}
     try:
-        startAnalysisTime = time.time()
-        with open(PDFfile, "rb") as fp:
-            pdfAsText = pdftotext.PDF(fp)        
-            separatorPages={}
-            pageNumber=0
-            for page in pdfAsText:
-                logging.info('Searching for separator on page: %d'% (pageNumber+1)) 
-                if str(page).find(separator) != -1:
-                    separatorPages[pageNumber]=''
-                    logging.info('Found separator on page: %d'% (pageNumber+1))
-                pageNumber += 1
-        logging.info('Analysis completed: %d separators found on %d pages. This step took about %d seconds'%(len(separatorPages),pageNumber, int(time.time() - startAnalysisTime)))
-        return separatorPages
+        with Pdf.open(PDFfile) as pdf:
+            pageCount = len(pdf.pages)
     except Exception as error:
-        logging.critical('Text-searching file %s failed. %e' % (PDFfile, error))
+        logging.critical('Text-searching file %s failed. %s' % (PDFfile, error))
         return separatorPages
 
-def analyzePage(PDF, pageNumber, separator='NEXT', mode='QR', cropfactor=1):
+    # Several ranges per worker keep the workers busy until the end
+    chunkSize = max(1, min(50, -(-pageCount // (max_workers * 4))))
+    pageRanges = [range(start, min(start + chunkSize, pageCount)) for start in range(0, pageCount, chunkSize)]
+    if window <= 0:
+        window = len(pageRanges)
+    else:
+        window = max(1, window // chunkSize)
+
+    logging.debug('Searching %d pages in ranges of %d pages with %d %s workers' % (pageCount, chunkSize, max_workers, executorType))
+    # Page ranges searched out of order and position in pageRanges up to which all pages have been searched
+    searched = set()
+    frontier = 0
+    with poolExecutor(executorType)(max_workers) as executor:
+        rangeQueue = iter(pageRanges)
+        future_range = {}
+        while True:
+            for pageRange in rangeQueue:
+                future_range[executor.submit(searchTextTask, PDFfile, pageRange, separator)] = pageRange
+                if len(future_range) >= window:
+                    break
+
+            if not future_range:
+                break
+
+            done, _ = concurrent.futures.wait(future_range, return_when=concurrent.futures.FIRST_COMPLETED)
+            for future in done:
+                pageRange = future_range.pop(future)
+                try:
+                    for pageNumber in future.result():
+                        separatorPages[pageNumber]=''
+                        logging.info('Found separator on page: %d'% (pageNumber+1))
+                except Exception as error:
+                    logging.critical('Text-searching pages %d-%d of file %s failed. %s' % (pageRange.start+1, pageRange.stop, PDFfile, error))
+                searched.add(pageRange.start)
+
+            if onConfirmed != None:
+                previousFrontier = frontier
+                while frontier < len(pageRanges) and pageRanges[frontier].start in searched:
+                    frontier += 1
+                if frontier != previousFrontier:
+                    onConfirmed(separatorPages, pageRanges[frontier].start if frontier < len(pageRanges) else float('inf'))
+
+    logging.info('Analysis completed: %d separators found on %d pages. This step took about %d seconds'%(len(separatorPages),pageCount, int(time.time() - startAnalysisTime)))
+    return separatorPages
+
+def poolExecutor(executorType='process'):
+    '''Executor class for executorType: thread or process'''
+    if executorType == 'thread':
+        return concurrent.futures.ThreadPoolExecutor
+    return concurrent.futures.ProcessPoolExecutor
+
+# One PDF object per worker thread / process. pikepdf objects can not be shared 
+# between threads or pickled, so every worker opens the files it needs by path once.
+_workerLocal = threading.local()
+
+def workerPDF(PDFfile):
+    '''Return PDFfile opened by the calling worker. The file is only opened once per worker.'''
+    openPDFs = getattr(_workerLocal, 'openPDFs', None)
+    if openPDFs is None:
+        openPDFs = _workerLocal.openPDFs = {}
+    if PDFfile not in openPDFs:
+        openPDFs[PDFfile] = Pdf.open(PDFfile)
+    return openPDFs[PDFfile]
+
+def workerText(PDFfile):
+    '''Return the text layer of PDFfile (pdftotext) loaded by the calling worker. The file is only loaded once per worker.'''
+    openTexts = getattr(_workerLocal, 'openTexts', None)
+    if openTexts is None:
+        openTexts = _workerLocal.openTexts = {}
+    if PDFfile not in openTexts:
+        with open(PDFfile, "rb") as fp:
+            openTexts[PDFfile] = pdftotext.PDF(fp)
+    return openTexts[PDFfile]
+
+def analyzePageTask(PDFfile, pageIndex, pageNumber, settings):
+    '''Worker entry point: Analyze page pageIndex of PDFfile and report it as pageNumber'''
+    return analyzePage(workerPDF(PDFfile), pageIndex, pageNumber, settings)
+
+def matchSeparator(barcodes, separator, pageNumber):
+    '''Return the postfix of the first barcode that starts with separator, 
+    an empty string if it has no postfix or None if no barcode matches'''
+    for barcode in barcodes:
+            
+        barcodeText=str(barcode.data.decode("utf-8"))
+        logging.debug('QR-Code / Barcode containing text "%s" found on page %d. Use | as delimiter if you want to use a custom postfix' % (str(barcodeText), pageNumber+1))
+        barcodeComponents = barcodeText.split('|',1)
+        
+        if len(barcodeComponents)==2 and barcodeComponents[0] == separator:
+            #Do not check for barcodes in remaining data
+            return str(barcodeComponents[1])  
+
+        elif barcodeComponents[0] == separator:
+            #Do not check for barcodes in remaining data
+            return ''  
+
+        else:
+            logging.debug('Ignored. Reason: "%s" on page %d does not start with separator "%s". Use | as delimiter if you want to use a custom postfix' % (str(barcodeText), pageNumber+1, separator))     
+    
+    return None
+
+def mightContainCode(image):
+    '''Cheap check if a greyscale image may contain a code. It needs some dark and some light pixels, 
+    blank or completely dark images can not contain a code.'''
+    histogram = image.histogram()
+    darkPixels = sum(histogram[:128])
+    total = sum(histogram)
+    return 0.001 < darkPixels / max(1, total) < 0.99
+
+def isPlainJPEG(pdfImage):
+    '''Check if pdfImage is a plain DCT (JPEG) image that libjpeg can decode to greyscale at a reduced scale'''
+    return (pdfImage.filters == ['/DCTDecode'] and pdfImage.bits_per_component == 8 and not pdfImage.image_mask 
+            and '/Decode' not in pdfImage.obj and pdfImage.colorspace in ('/DeviceGray', '/DeviceRGB', '/ICCBased', '/CalGray', '/CalRGB'))
+
+def extractImage(pdfImage, scale=1):
+    '''Extract pdfImage as greyscale image at scale. 
+    Plain DCT (JPEG) images are decoded by libjpeg directly to greyscale and at the smallest
+    DCT scale (1/2, 1/4, 1/8) that is not below scale (PIL draft mode). All other images are 
+    fully decoded and reduced.'''
+    image = None
+    if isPlainJPEG(pdfImage):
+        image = Image.open(BytesIO(pdfImage.obj.read_raw_bytes()))
+        # CMYK JPEGs may be stored inverted, let pikepdf handle them
+        if image.mode in ('L', 'RGB', 'YCbCr'):
+            image.draft('L', (max(1, int(pdfImage.width*scale)), max(1, int(pdfImage.height*scale))))
+        else:
+            image.close()
+            image = None
+
+    if image == None:
+        image = pdfImage.as_pil_image()
+        if scale < 1:
+            if image.mode not in ('L', 'RGB'):
+                image = image.convert('L')
+            image = image.reduce(max(1, round(1 / scale)))
+
+    if image.mode != 'L':
+        image = image.convert('L')
+    return image
+
+def cropRegion(image, region):
+    '''Crop the search area region (left, top, right, bottom as fractions of width / height) from image'''
+    width, height = image.size
+    return image.crop((int(width*region[0]), int(height*region[1]), int(width*region[2]), int(height*region[3])))
+
+def multiplyMatrix(m, n):
+    '''Concatenate the PDF transformation matrices m and n (a, b, c, d, e, f): m is applied first'''
+    return (m[0]*n[0] + m[1]*n[2], m[0]*n[1] + m[1]*n[3],
+            m[2]*n[0] + m[3]*n[2], m[2]*n[1] + m[3]*n[3],
+            m[4]*n[0] + m[5]*n[2] + n[4], m[4]*n[1] + m[5]*n[3] + n[5])
+
+def pageImages(page, withPlacement=False):
+    '''Return all images of page as list of (name, image, matrix), including images in Form XObjects.
+    If withPlacement is True the content streams are parsed and matrix maps the unit square of the 
+    image to default user space. Only images that are drawn are returned in this case. 
+    Otherwise matrix is None and all images in the resources are returned.'''
+    images = []
+
+    def walkResources(resources, prefix, visited):
+        for name, xobject in resources.get('/XObject', Dictionary()).items():
+            if xobject.get('/Subtype') == '/Image':
+                images.append((prefix + name, xobject, None))
+            elif xobject.get('/Subtype') == '/Form' and xobject.objgen not in visited:
+                walkResources(xobject.get('/Resources', Dictionary()), prefix + name, visited | {xobject.objgen})
+
+    def walkContent(content, resources, ctm, prefix, visited):
+        stack = []
+        xobjects = resources.get('/XObject', Dictionary())
+        for operands, operator in parse_content_stream(content, 'q Q cm Do'):
+            operator = str(operator)
+            if operator == 'q':
+                stack.append(ctm)
+            elif operator == 'Q' and stack:
+                ctm = stack.pop()
+            elif operator == 'cm':
+                ctm = multiplyMatrix(tuple(float(value) for value in operands), ctm)
+            elif operator == 'Do' and str(operands[0]) in xobjects:
+                name = str(operands[0])
+                xobject = xobjects[name]
+                if xobject.get('/Subtype') == '/Image':
+                    images.append((prefix + name, xobject, ctm))
+                elif xobject.get('/Subtype') == '/Form' and xobject.objgen not in visited:
+                    formMatrix = tuple(float(value) for value in xobject.get('/Matrix', [1, 0, 0, 1, 0, 0]))
+                    walkContent(xobject, xobject.get('/Resources', resources), multiplyMatrix(formMatrix, ctm), prefix + name, visited | {xobject.objgen})
+
+    resources = page.get('/Resources', Dictionary())
+    if withPlacement:
+        walkContent(page, resources, (1, 0, 0, 1, 0, 0), '', set())
+    else:
+        walkResources(resources, '', set())
+
+    # Images drawn more than once are searched where they are drawn first
+    uniqueImages = []
+    seen = set()
+    for name, image, matrix in images:
+        key = image.objgen if image.objgen != (0, 0) else name
+        if key not in seen:
+            seen.add(key)
+            uniqueImages.append((name, image, matrix))
+    return uniqueImages
+
+def imageDigest(image):
+    '''Digest of the stream data and the dictionary entries that matter for decoding of an image XObject'''
+    digest = hashlib.blake2b(image.read_raw_bytes(), digest_size=16)
+    for key in ('/Width', '/Height', '/BitsPerComponent', '/ColorSpace', '/Filter', '/DecodeParms', '/Decode', '/ImageMask'):
+        digest.update(repr(image.get(key)).encode())
+    return digest.hexdigest()
+
+def workerCache(name, maxEntries=1000):
+    '''Return the cache name of the calling worker. It is emptied when it grows beyond maxEntries.'''
+    cache = getattr(_workerLocal, name, None)
+    if cache is None or len(cache) > maxEntries:
+        cache = {}
+        setattr(_workerLocal, name, cache)
+    return cache
+
+def pageRegionToImage(region, page, matrix):
+    '''Map the search area region (left, top, right, bottom as fractions of the page as it is displayed,
+    i.e. after /Rotate) to the area of an image drawn with matrix. Returns the bounding box in 
+    fractions of the image (origin top left) or None if the image does not cover the search area.'''
+    x0, y0, x1, y1 = [float(value) for value in page.cropbox]
+    width, height = x1 - x0, y1 - y0
+    rotate = int(page.get('/Rotate', 0)) % 360
+
+    # Page coordinates (u to the right, v downwards) of the displayed page to default user space
+    def toUserSpace(u, v):
+        if rotate == 90:
+            return x0 + v*width, y0 + u*height
+        elif rotate == 180:
+            return x1 - u*width, y0 + v*height
+        elif rotate == 270:
+            return x1 - v*width, y1 - u*height
+        return x0 + u*width, y1 - v*height
+
+    a, b, c, d, e, f = matrix
+    determinant = a*d - b*c
+    if determinant == 0:
+        return None
+
+    imageX = []
+    imageY = []
+    for u, v in ((region[0], region[1]), (region[2], region[1]), (region[0], region[3]), (region[2], region[3])):
+        x, y = toUserSpace(u, v)
+        x, y = x - e, y - f
+        # Inverse of matrix. Row 0 of the image is at the top of the unit square.
+        imageX.append((d*x - c*y) / determinant)
+        imageY.append(1 - (a*y - b*x) / determinant)
+
+    left, top = max(0, min(imageX)), max(0, min(imageY))
+    right, bottom = min(1, max(imageX)), min(1, max(imageY))
+    if left >= right or top >= bottom:
+        return None
+    return (left, top, right, bottom)
+
+def finderPatternRuns(binary):
+    '''Count the run sequences dark-light-dark-light-dark with the length ratio 1:1:3:1:1 
+    of a QR code finder pattern along the rows of binary (True = dark pixel)'''
+    height, width = binary.shape
+    # A run starts in the first column and wherever the colour changes
+    runStart = np.ones((height, width), dtype=bool)
+    runStart[:, 1:] = binary[:, 1:] != binary[:, :-1]
+    rows, starts = np.nonzero(runStart)
+    if len(starts) < 5:
+        return 0
+    lastInRow = np.append(rows[1:] != rows[:-1], True)
+    ends = np.where(lastInRow, width, np.append(starts[1:], width))
+    lengths = (ends - starts).astype(np.float32)
+    dark = binary[rows, starts]
+
+    # All windows of five consecutive runs that start with a dark run and lie in one row
+    count = len(lengths) - 4
+    runs = [lengths[i:i+count] for i in range(5)]
+    unit = sum(runs) / 7
+    tolerance = unit / 2
+    matches = dark[:count] & (rows[:count] == rows[4:]) & (unit >= 1)
+    for run, modules in zip(runs, (1, 1, 3, 1, 1)):
+        matches &= np.abs(run - modules * unit) < modules * tolerance
+    return int(np.count_nonzero(matches))
+
+def hasFinderPattern(image, minRuns=3):
+    '''Fast check if a greyscale image may contain a QR code: The 1:1:3:1:1 signature of the 
+    finder patterns has to be found in horizontal and vertical direction.'''
+    pixels = np.asarray(image)
+    if pixels.size == 0:
+        return False
+    # A code may cover only a small part of the search area, a fixed threshold does not depend on it
+    binary = pixels < 128
+    # Three finder patterns have at least 3 x 33 dark modules. Blank areas are skipped without counting runs, 
+    # completely dark areas have no runs.
+    if np.count_nonzero(binary) < 99:
+        return False
+    return finderPatternRuns(binary) >= minRuns and finderPatternRuns(np.ascontiguousarray(binary.T)) >= minRuns
+
+# Kodak patch codes: four parallel bars, wide (W, 0.2") or narrow (N, 0.08"), 0.2" apart. Patch II is patch 2.
+patchCodes = {'1': 'WNNW', '2': 'WNWN', '3': 'WWNN', '4': 'NWNW', '6': 'NNWW', 'T': 'WNNN'}
+
+def patchSeparators(separator):
+    '''Patch codes accepted as separator in PATCH mode. separator is a comma separated list 
+    of patch codes, e.g. T,2 (II is the same as 2). The default separator NEXT accepts patch T and 2.'''
+    if separator == 'NEXT':
+        return ['T', '2']
+    names = [{'II': '2'}.get(name.strip().upper(), name.strip().upper()) for name in separator.split(',')]
+    unknown = [name for name in names if name not in patchCodes]
+    if unknown:
+        raise ValueError('Unknown patch code %s. Use a comma separated list of %s' % (','.join(unknown), ', '.join(patchCodes)))
+    return names
+
+def patchPattern(profile):
+    '''Bar pattern (e.g. WNNN) of the first four bars with quiet zones in profile, the fraction 
+    of dark pixels of each line across the bars. Returns None if there are no such bars.'''
+    bar = np.concatenate(([False], profile > 0.75, [False]))
+    edges = np.flatnonzero(bar[1:] != bar[:-1])
+    starts, ends = edges[0::2], edges[1::2]
+    widths = ends - starts
+    for i in range(len(widths) - 3):
+        narrow, wide = widths[i:i+4].min(), widths[i:i+4].max()
+        # Patch codes have narrow and wide bars. The bars are about as far apart as a wide bar is wide.
+        if narrow < 1 or wide < 1.8 * narrow:
+            continue
+        gaps = starts[i+1:i+4] - ends[i:i+3]
+        if gaps.min() < wide / 2 or gaps.max() > 2 * wide:
+            continue
+        # Nothing that looks like a bar right before or after the patch code
+        if (i > 0 and starts[i] - ends[i-1] < wide) or (i + 4 < len(widths) and starts[i+4] - ends[i+3] < wide):
+            continue
+        return ''.join('W' if width > (narrow + wide) / 2 else 'N' for width in widths[i:i+4])
+    return None
+
+def readPatchCode(image):
+    '''Find a patch code in a greyscale image. The bars of a patch code span most of the sheet, so 
+    the lines of three bands along and across the image are checked for bars. Returns the patch code or None.
+    The bars are read top to bottom / left to right. Upside down, Patch 2 and 4 and Patch 3 and 6 
+    show each other's pattern, only Patch T is recognized in both orientations.'''
+    pixels = np.asarray(image)
+    if pixels.size == 0:
+        return None
+    dark = pixels < 128
+    profiles = [band.mean(axis=1) for band in np.array_split(dark, 3, axis=1) if band.size] 
+    profiles += [band.mean(axis=0) for band in np.array_split(dark, 3, axis=0) if band.size]
+    for profile in profiles:
+        pattern = patchPattern(profile)
+        if pattern == None:
+            continue
+        for code, bars in patchCodes.items():
+            # Upside down Patch T (NNNW) is no other patch code. Patch 1 reads the same both ways.
+            if pattern == bars or (code == 'T' and pattern[::-1] == bars):
+                return code
+    return None
+
+def matchPatch(image, separator, pageNumber):
+    '''Return an empty string (no postfix) if image shows one of the patch codes given by separator, otherwise None'''
+    code = readPatchCode(image)
+    if code == None:
+        return None
+    if code in patchSeparators(separator):
+        logging.debug('Patch code %s found on page %d' % (code, pageNumber+1))
+        return ''
+    logging.debug('Ignored. Reason: Patch code %s on page %d is not a separator "%s"' % (code, pageNumber+1, separator))
+    return None
+
+def searchPatch(pdfImage, regions, separator, pageNumber):
+    '''Search the search areas of pdfImage for a patch code. The image is decoded at about 50 dpi 
+    (long side of a letter / A4 page 600 pixels), which is enough for the 0.08" narrow bars.'''
+    image = extractImage(pdfImage, min(1, 600 / max(pdfImage.width, pdfImage.height, 1)))
+    try:
+        for region in regions:
+            separatorCode = matchPatch(cropRegion(image, region), separator, pageNumber)
+            if separatorCode != None:
+                return separatorCode
+        return None
+    finally:
+        image.close()
+
+def isBlankImage(image, settings):
+    '''Check if a greyscale image of a page is blank. Margins (settings['blankMargin'], fraction of 
+    width / height) are ignored. Ink are pixels that are at least 64 grey levels darker than the paper. 
+    The page is blank if ink covers at most settings['blankInk'] percent and the standard deviation 
+    of the grey levels is at most settings['blankDeviation'].'''
+    margin = settings.get('blankMargin', 0.05)
+    pixels = np.asarray(cropRegion(image, (margin, margin, 1 - margin, 1 - margin)), dtype=np.float32)
+    if pixels.size == 0:
+        return True
+    paper = np.percentile(pixels, 95)
+    if paper < 128:
+        # Dark or inverted page
+        return False
+    ink = np.count_nonzero(pixels < paper - 64) * 100 / pixels.size
+    deviation = float(pixels.std())
+    logging.debug('Ink coverage %.3f%%, deviation %.1f' % (ink, deviation))
+    return ink <= settings.get('blankInk', 0.3) and deviation <= settings.get('blankDeviation', 25)
+
+def searchBlank(images, pageNumber, settings):
+    '''Return an empty string (no postfix) if page pageNumber is blank, otherwise None. A page is blank 
+    if all of its images are blank. Pages without images are rendered (--render-fallback) or not blank.'''
+    blankImages = 0
+    for name, imageObject, matrix in images:
+        try:
+            pdfImage = PdfImage(imageObject)
+            # Page size images at about 35 dpi are enough to see ink
+            image = extractImage(pdfImage, min(1, 400 / max(pdfImage.width, pdfImage.height, 1)))
+            blank = isBlankImage(image, settings)
+            image.close()
+        except Exception as error:
+            if settings.get('strict', False):
+                raise
+            logging.debug('Reading image %s failed. Page %d is not treated as blank. %s' % (name, pageNumber+1, error))
+            return None
+        if not blank:
+            return None
+        blankImages += 1
+
+    if blankImages == 0:
+        if not settings.get('renderFallback'):
+            logging.debug('Page %d has no images and is not treated as blank' % (pageNumber+1))
+            return None
+        try:
+            image = renderRegion(settings['sourceFile'], pageNumber, (0, 0, 1, 1), min(36, settings.get('renderDPI', 100)))
+        except Exception as error:
+            logging.debug('Rendering page %d failed: %s' % (pageNumber+1, error))
+            return None
+        blank = isBlankImage(image, settings)
+        image.close()
+        if not blank:
+            return None
+
+    logging.debug('Blank page %d' % (pageNumber+1))
+    return ''
+
+def destroyScanners(scanners):
+    '''Free the zbar scanners of a thread'''
+    for scanner in scanners.values():
+        zbar_image_scanner_destroy(scanner)
+    scanners.clear()
+
+def zbarScanner(symbols, scanDensity):
+    '''Persistent zbar image scanner of the current worker thread, configured for symbols and 
+    scanDensity (x, y). Scan density n means that zbar only scans every nth line / column.'''
+    scanners = getattr(_workerLocal, 'scanners', None)
+    if scanners == None:
+        scanners = _workerLocal.scanners = {}
+        # Free the scanners when the thread has ended
+        weakref.finalize(threading.current_thread(), destroyScanners, scanners)
+    key = (tuple(symbols) if symbols else None, scanDensity)
+    scanner = scanners.get(key)
+    if scanner == None:
+        scanner = zbar_image_scanner_create()
+        # Same symbology configuration as pyzbar's decode
+        if symbols:
+            for symbol in set(ZBarSymbol).difference(symbols):
+                zbar_image_scanner_set_config(scanner, symbol, ZBarConfig.CFG_ENABLE, 0)
+            for symbol in symbols:
+                zbar_image_scanner_set_config(scanner, symbol, ZBarConfig.CFG_ENABLE, 1)
+        zbar_image_scanner_set_config(scanner, ZBarSymbol.NONE, ZBarConfig.CFG_X_DENSITY, scanDensity[0])
+        zbar_image_scanner_set_config(scanner, ZBarSymbol.NONE, ZBarConfig.CFG_Y_DENSITY, scanDensity[1])
+        logging.debug('Created zbar scanner with scan density %d,%d' % scanDensity)
+        scanners[key] = scanner
+    return scanner
+
+def scanImage(image, symbols, settings):
+    '''Decode the codes in image like pyzbar's decode, but with the persistent scanner of the worker thread.'''
+    if not persistentScanners:
+        return decode(image, symbols)
+    scanner = zbarScanner(symbols, settings.get('scanDensity', (1, 1)))
+    pixels, width, height = _pixel_data(image)
+    zbarImage = zbar_image_create()
+    try:
+        zbar_image_set_format(zbarImage, _FOURCC['L800'])
+        zbar_image_set_size(zbarImage, width, height)
+        zbar_image_set_data(zbarImage, cast(pixels, c_void_p), len(pixels), None)
+        if zbar_scan_image(scanner, zbarImage) < 0:
+            raise PyZbarError('Unsupported image format')
+        return list(_decode_symbols(_symbols_for_image(zbarImage)))
+    finally:
+        zbar_image_destroy(zbarImage)
+
+# Result of the decoder backends that are not pyzbar, matchSeparator only needs data
+Decoded = namedtuple('Decoded', 'data type')
+
+# zbar symbology names and the matching zxing-cpp barcode formats
+zxingFormats = {'QRCODE': 'QRCode', 'CODE128': 'Code128', 'CODE39': 'Code39', 'CODE93': 'Code93', 'EAN8': 'EAN8', 
+                'EAN13': 'EAN13', 'ISBN10': 'EAN13', 'ISBN13': 'EAN13', 'UPCA': 'UPCA', 'UPCE': 'UPCE', 'I25': 'ITF', 
+                'CODABAR': 'Codabar', 'PDF417': 'PDF417', 'DATABAR': 'DataBar', 'DATABAR_EXP': 'DataBarExpanded'}
+
+def zxingDecode(image, symbols, settings):
+    '''Decode the codes in image with zxing-cpp (Python package zxing-cpp)'''
+    import zxingcpp
+    if symbols:
+        formats = reduce(operator.or_, [getattr(zxingcpp.BarcodeFormat, zxingFormats[symbol.name]) 
+                                        for symbol in symbols if symbol.name in zxingFormats])
+        results = zxingcpp.read_barcodes(np.asarray(image), formats=formats)
+    else:
+        results = zxingcpp.read_barcodes(np.asarray(image))
+    return [Decoded(result.text.encode('utf-8'), str(result.format)) for result in results]
+
+def opencvDecode(image, symbols, settings):
+    '''Decode the QR codes in image with the QR code detector of OpenCV (Python package opencv-python-headless)'''
+    import cv2
+    detector = getattr(_workerLocal, 'qrDetector', None)
+    if detector == None:
+        detector = _workerLocal.qrDetector = cv2.QRCodeDetector()
+    found, texts, points, straightCodes = detector.detectAndDecodeMulti(np.asarray(image))
+    if not found:
+        return []
+    return [Decoded(text.encode('utf-8'), 'QRCODE') for text in texts if text]
+
+# Decoder backends. Each one returns the codes found in a greyscale image as a list of objects with data (bytes).
+decoderBackends = {'pyzbar': scanImage, 'zxing': zxingDecode, 'opencv': opencvDecode}
+
+def decodeImage(image, symbols, settings):
+    '''Decode the codes in image with the decoder backend selected in settings'''
+    return decoderBackends[settings.get('decoder', 'pyzbar')](image, symbols, settings)
+
+def decoderAvailable(decoder, mode='QR', symbologies=None):
+    '''Check if decoder can be used in mode with symbologies by decoding a blank image'''
+    symbols = modeSymbols({'mode': mode, 'symbologies': symbologies})
+    if decoder == 'opencv' and (symbols == None or any(symbol != ZBarSymbol.QRCODE for symbol in symbols)):
+        logging.warning('Decoder opencv can only decode QR codes')
+        return False
+    unsupported = [symbol.name for symbol in symbols or [] if symbol.name not in zxingFormats]
+    if decoder == 'zxing' and unsupported:
+        logging.warning('Decoder zxing can not decode %s' % ', '.join(unsupported))
+        return False
+    try:
+        decodeImage(Image.new('L', (64, 64), 255), symbols, {'decoder': decoder})
+        return True
+    except Exception as error:
+        logging.warning('Decoder %s is not available: %s' % (decoder, error))
+        return False
+
+def tileBoxes(width, height, tileSize, overlap):
+    '''Split an area of width x height pixels into tiles of tileSize x tileSize pixels that overlap by 
+    overlap pixels. Returns the boxes row by row starting in the upper left corner.'''
+    def starts(length):
+        if length <= tileSize:
+            return [0]
+        return list(range(0, length - tileSize, tileSize - overlap)) + [length - tileSize]
+    return [(x, y, min(x + tileSize, width), min(y + tileSize, height)) for y in starts(height) for x in starts(width)]
+
+def workerTilePool(tileThreads):
+    '''Thread pool of the calling worker that decodes tiles. It lives as long as the worker, 
+    so its threads keep their zbar scanners from page to page.'''
+    tilePool = getattr(_workerLocal, 'tilePool', None)
+    if tilePool == None:
+        tilePool = _workerLocal.tilePool = concurrent.futures.ThreadPoolExecutor(tileThreads)
+    return tilePool
+
+def decodeTiles(image, symbols, separator, pageNumber, settings):
+    '''Decode image and return the separator code or None. Images larger than settings['tileSize'] 
+    are split into overlapping tiles. The tiles are decoded in order (or by settings['tileThreads'] 
+    threads) until a separator is found.'''
+    tileSize = settings.get('tileSize', 0)
+    width, height = image.size
+    if tileSize <= 0 or (width <= tileSize and height <= tileSize):
+        return matchSeparator(decodeImage(image, symbols, settings), separator, pageNumber)
+
+    # Codes cut by a tile border are complete in the neighbouring tile if they are smaller than the overlap 
+    boxes = tileBoxes(width, height, tileSize, tileSize // 4)
+    tileThreads = settings.get('tileThreads', 1)
+    logging.debug('Searching %d tiles on page %d with %d threads' % (len(boxes), pageNumber+1, tileThreads))
+
+    if tileThreads <= 1:
+        for box in boxes:
+            separatorCode = matchSeparator(decodeImage(image.crop(box), symbols, settings), separator, pageNumber)
+            if separatorCode != None:
+                logging.debug('Separator found in tile %s on page %d' % (str(box), pageNumber+1))
+                return separatorCode
+        return None
+
+    # The decoders run without the GIL, so the tiles of one page can be decoded in parallel (one scanner per thread)
+    separatorCode = None
+    executor = workerTilePool(tileThreads)
+    futures = {executor.submit(decodeImage, image.crop(box), symbols, settings): box for box in boxes}
+    for future in concurrent.futures.as_completed(futures):
+        separatorCode = matchSeparator(future.result(), separator, pageNumber)
+        if separatorCode != None:
+            logging.debug('Separator found in tile %s on page %d' % (str(futures[future]), pageNumber+1))
+            # Tiles that are not decoded yet are not needed anymore
+            for pendingFuture in futures:
+                pendingFuture.cancel()
+            break
+    return separatorCode
+
+def searchImage(pdfImage, regions, symbols, separator, pageNumber, settings):
+    '''Decode the barcodes in the search areas of pdfImage and return the separator code or None.
+    The search areas (fractions of the image) in regions are searched in this order, the first hit wins.
+    If settings['qrPrefilter'] is set in QR mode, search areas without QR finder pattern are not decoded.
+    If settings['coarseScale'] is below 1 the image is decoded at this scale first. Full resolution
+    is only decoded for search areas without separator that might contain a code. In QR mode this 
+    needs a QR finder pattern at the coarse scale, text pages are not decoded twice.'''
+    coarseScale = settings.get('coarseScale', 1)
+    qrMode = settings.get('mode', 'QR') == 'QR'
+    prefilter = settings.get('qrPrefilter', False) and qrMode
+    separatorCode = None
+
+    if coarseScale < 1 or prefilter:
+        # The prefilter works on the coarse image or at half resolution
+        lowResolutionScale = coarseScale if coarseScale < 1 else 0.5
+        lowResolutionImage = extractImage(pdfImage, lowResolutionScale)
+
+    if prefilter:
+        candidateRegions = []
+        for region in regions:
+            if hasFinderPattern(cropRegion(lowResolutionImage, region)):
+                candidateRegions.append(region)
+            else:
+                logging.debug('No QR code finder pattern in search area %s on page %d' % (str(region), pageNumber+1))
+        regions = candidateRegions
+
+    fullResolutionRegions = regions
+
+    if coarseScale < 1:
+        fullResolutionRegions = []
+        for region in regions:
+            regionImage = cropRegion(lowResolutionImage, region)
+            separatorCode = matchSeparator(decodeImage(regionImage, symbols, settings), separator, pageNumber)
+            if separatorCode != None:
+                logging.debug('Separator found at scale %.2f in search area %s on page %d' % (coarseScale, str(region), pageNumber+1))
+                break
+            if qrMode:
+                # Search areas that passed the prefilter have a finder pattern already
+                mightContain = prefilter or hasFinderPattern(regionImage)
+            else:
+                mightContain = mightContainCode(regionImage)
+            if mightContain:
+                fullResolutionRegions.append(region)
+            else:
+                logging.debug('No code in search area %s on page %d at scale %.2f, skipping full resolution' % (str(region), pageNumber+1, coarseScale))
+
+    if coarseScale < 1 or prefilter:
+        lowResolutionImage.close()
+
+    if separatorCode != None or len(fullResolutionRegions) == 0:
+        return separatorCode
+
+    image = extractImage(pdfImage)
+    logging.debug('Extracting and analyzing an image of type %s on page %d' % (type(image),pageNumber+1))
+    for region in fullResolutionRegions:
+        separatorCode = decodeTiles(cropRegion(image, region), symbols, separator, pageNumber, settings)
+        if separatorCode != None:
+            logging.debug('Separator found in search area %s on page %d' % (str(region), pageNumber+1))
+            break
+    image.close()
+    return separatorCode
+
+def searchRegion(text):
+    '''Parse a search area given as LEFT,TOP,RIGHT,BOTTOM fractions of the page (origin top left)'''
+    try:
+        region = tuple(float(value) for value in text.split(','))
+    except ValueError:
+        raise argparse.ArgumentTypeError('Search area must be given as LEFT,TOP,RIGHT,BOTTOM: %s' % text)
+    if len(region) != 4 or not (0 <= region[0] < region[2] <= 1 and 0 <= region[1] < region[3] <= 1):
+        raise argparse.ArgumentTypeError('Search area must be given as LEFT,TOP,RIGHT,BOTTOM with 0 <= LEFT < RIGHT <= 1 and 0 <= TOP < BOTTOM <= 1: %s' % text)
+    return region
+
+def densityValues(text):
+    '''Parse a zbar scan density given as X,Y or as a single value for both directions'''
+    try:
+        density = tuple(int(value) for value in text.split(','))
+    except ValueError:
+        raise argparse.ArgumentTypeError('Scan density must be given as X,Y or as a single number: %s' % text)
+    if len(density) == 1:
+        density = density * 2
+    if len(density) != 2 or min(density) < 1:
+        raise argparse.ArgumentTypeError('Scan density must be given as X,Y with X >= 1 and Y >= 1: %s' % text)
+    return density
+
+def symbologyList(text):
+    '''Parse a comma separated list of zbar symbology names (e.g. CODE128,CODE39) for argparse.'''
+    names = [name.strip().upper() for name in text.split(',') if name.strip()]
+    supported = [name for name in ZBarSymbol.__members__ if name not in ('NONE', 'PARTIAL')]
+    unknown = [name for name in names if name not in supported]
+    if unknown or not names:
+        raise argparse.ArgumentTypeError('unsupported symbology %s (supported: %s)' % (','.join(unknown) or repr(text), ', '.join(supported)))
+    return names
+
+def imageCandidates(images, settings):
+    '''Drop images that can not contain a separator code judging by their dictionary 
+    (e.g. logos, thumbnails and masks) and sort the rest by size, largest first. 
+    Nothing has to be decoded for this.'''
+    minImageSize = settings.get('minImageSize', 21)
+    candidates = []
+    for name, imageObject, matrix in images:
+        try:
+            width, height = int(imageObject.get('/Width', 0)), int(imageObject.get('/Height', 0))
+            bitsPerComponent = int(imageObject.get('/BitsPerComponent', 1 if imageObject.get('/ImageMask', False) else 8))
+        except Exception:
+            # Let the decoder deal with broken dictionaries
+            candidates.append((name, imageObject, matrix, 0))
+            continue
+
+        # A QR code needs at least 21 x 21 modules, 1-D barcodes can be very flat
+        if settings.get('mode', 'QR') == 'QR':
+            shortSide = min(width, height)
+        else:
+            shortSide = max(width, height)
+        if shortSide < minImageSize:
+            logging.debug('Skipping image %s (%d x %d pixels). It is too small to contain a code.' % (name, width, height))
+            continue
+        candidates.append((name, imageObject, matrix, width * height * bitsPerComponent))
+
+    candidates.sort(key=lambda candidate: candidate[3], reverse=True)
+    return [(name, imageObject, matrix) for name, imageObject, matrix, size in candidates]
+
+def perceptualHash(pdfImage):
+    '''64 bit difference hash (dHash) of pdfImage. Scans of the same printed page get the same hash 
+    in most cases. Returns None for almost uniform images since they can not be told apart from a 
+    blank page with a small code. Returns None for images that are not plain JPEGs, too: They would 
+    be fully decoded for the hash and once more for the search.'''
+    if not isPlainJPEG(pdfImage):
+        return None
+    image = extractImage(pdfImage, 1/8)
+    thumbnail = image.resize((9, 8), Image.BILINEAR)
+    image.close()
+    pixels = list(thumbnail.getdata())
+    bits = 0
+    for row in range(8):
+        for column in range(8):
+            bits = bits << 1 | (pixels[row*9 + column] > pixels[row*9 + column + 1])
+    if bin(bits).count('1') < 8:
+        return None
+    return '%016x' % bits
+
+def verdictKey(kind, imageHash, imageRegions, settings):
+    '''Key of a verdict in the verdict cache file. Verdicts depend on separator, mode (symbologies, scan density, decoder, prefilter) and search area.'''
+    mode = settings.get('mode', 'QR')
+    # Same condition as in modeSymbols
+    if mode != 'QR' and settings.get('symbologies'):
+        mode = mode + ':' + '+'.join(sorted(settings['symbologies']))
+    if tuple(settings.get('scanDensity', (1, 1))) != (1, 1):
+        mode = mode + '@%d,%d' % tuple(settings['scanDensity'])
+    if settings.get('decoder', 'pyzbar') != 'pyzbar':
+        mode = mode + '/' + settings['decoder']
+    # The prefilter skips decoding, its negative verdicts are not those of a full decode
+    if settings.get('qrPrefilter', False) and settings.get('mode', 'QR') == 'QR':
+        mode = mode + '+prefilter'
+    return '%s|%s|%s|%s|%s' % (kind, mode, settings.get('separator', 'NEXT'), 
+                               ';'.join('%.4f,%.4f,%.4f,%.4f' % region for region in imageRegions), imageHash)
+
+def loadVerdictCache(cacheFile):
+    '''Load the verdicts of previous runs from cacheFile. Returns an empty cache if it does not exist.'''
+    try:
+        with open(cacheFile, 'r') as f:
+            return json.load(f).get('verdicts', {})
+    except FileNotFoundError:
+        return {}
+    except Exception as error:
+        logging.warning('Loading verdict cache %s failed. Starting with an empty cache. %s' % (cacheFile, error))
+        return {}
+
+def saveVerdictCache(cacheFile, verdicts, maxEntries=100000):
+    '''Add verdicts to cacheFile. The oldest entries are dropped if there are more than maxEntries.'''
+    if len(verdicts) == 0:
+        return
+    cachedVerdicts = loadVerdictCache(cacheFile)
+    for key, separatorCode in verdicts.items():
+        # Move updated entries to the end, they are dropped last
+        cachedVerdicts.pop(key, None)
+        cachedVerdicts[key] = separatorCode
+    cachedVerdicts = dict(list(cachedVerdicts.items())[-maxEntries:])
+    try:
+        with open(cacheFile + '.tmp', 'w') as f:
+            json.dump({'version': 1, 'verdicts': cachedVerdicts}, f)
+        replace(cacheFile + '.tmp', cacheFile)
+        logging.debug('Saved %d new verdicts to verdict cache %s' % (len(verdicts), cacheFile))
+    except Exception as error:
+        logging.warning('Saving verdict cache %s failed. %s' % (cacheFile, error))
+
+def workerVerdictCache(cacheFile):
+    '''Verdicts of previous runs. Every worker loads cacheFile once.'''
+    cachedVerdicts = getattr(_workerLocal, 'cachedVerdicts', None)
+    if cachedVerdicts is None or cachedVerdicts[0] != cacheFile:
+        cachedVerdicts = _workerLocal.cachedVerdicts = (cacheFile, loadVerdictCache(cacheFile))
+    return cachedVerdicts[1]
+
+def renderRegion(PDFfile, pageIndex, region, dpi=100):
+    '''Rasterize the search area region (fractions of the page as it is displayed) of page pageIndex 
+    of PDFfile at dpi as greyscale image. pdftoppm renders only the search area, Ghostscript renders 
+    the whole page which is cropped afterwards.'''
+    if which('pdftoppm'):
+        page = workerPDF(PDFfile).pages[pageIndex]
+        x0, y0, x1, y1 = [float(value) for value in page.cropbox]
+        width, height = abs(x1 - x0) * dpi / 72, abs(y1 - y0) * dpi / 72
+        if int(page.get('/Rotate', 0)) % 180 == 90:
+            width, height = height, width
+        left, top = int(width*region[0]), int(height*region[1])
+        command = ['pdftoppm', '-gray', '-cropbox', '-singlefile', '-r', str(dpi), '-f', str(pageIndex+1), '-l', str(pageIndex+1), 
+                   '-x', str(left), '-y', str(top), '-W', str(max(1, int(width*region[2]) - left)), '-H', str(max(1, int(height*region[3]) - top)), PDFfile]
+        logging.debug(command)
+        return Image.open(BytesIO(subprocess.run(command, capture_output=True, check=True, timeout=120).stdout)).convert('L')
+
+    command = ['gs', '-q', '-dSAFER', '-dBATCH', '-dNOPAUSE', '-sDEVICE=pnggray', '-r%d' % dpi, '-dUseCropBox', 
+               '-dFirstPage=%d' % (pageIndex+1), '-dLastPage=%d' % (pageIndex+1), '-sOutputFile=-', PDFfile]
+    logging.debug(command)
+    with Image.open(BytesIO(subprocess.run(command, capture_output=True, check=True, timeout=120).stdout)) as image:
+        return cropRegion(image.convert('L'), region)
+
+def searchRendered(pageNumber, symbols, settings):
+    '''Render the search areas of page pageNumber of the source PDF at low resolution and decode them. 
+    Finds codes drawn as vector graphics that are not part of any image. Returns the separator code or None.'''
+    for region in settings.get('regions', [(0, 0, 1, 1)]):
+        try:
+            image = renderRegion(settings['sourceFile'], pageNumber, region, settings.get('renderDPI', 100))
+        except Exception as error:
+            logging.debug('Rendering search area %s of page %d failed: %s' % (str(region), pageNumber+1, error))
+            continue
+        if settings.get('mode', 'QR') == 'PATCH':
+            separatorCode = matchPatch(image, settings.get('separator', 'NEXT'), pageNumber)
+        else:
+            separatorCode = decodeTiles(image, symbols, settings.get('separator', 'NEXT'), pageNumber, settings)
+        image.close()
+        if separatorCode != None:
+            logging.debug('Separator found in rendered search area %s on page %d' % (str(region), pageNumber+1))
+            return separatorCode
+    return None
+
+def modeSymbols(settings):
+    '''Symbologies to decode: QR codes in QR mode, the configured symbologies or None (all) in BARCODE mode.
+    ANY mode decodes QR codes unless symbologies are configured.'''
+    mode = settings.get('mode', 'QR')
+    if mode != 'QR' and settings.get('symbologies'):
+        return [ZBarSymbol[name] for name in settings['symbologies']]
+    elif mode in ('QR', 'ANY'):
+        return [ZBarSymbol.QRCODE]
+    return None
+
+def analyzePage(PDF, pageIndex, pageNumber, settings):
+    
+    separator = settings.get('separator', 'NEXT')
+    # Raise extraction / decoding errors instead of skipping the image (adaptive rewrite)
+    strict = settings.get('strict', False)
 
     #Set separatorCode to None. If separatorCode has any other value than None
     #a separator was found on the page
     separatorCode=None
     logging.debug('Analyzing page: %d'% (pageNumber+1))      
    
-    if mode == 'QR':
-        symbols = [ZBarSymbol.QRCODE]
-    else: 
-        symbols = None        
+    symbols = modeSymbols(settings)
+
+    # ANY mode: The text layer of the source PDF is cheaper to search than images. The rewritten PDF has no text.
+    if settings.get('mode', 'QR') == 'ANY':
+        try:
+            if str(workerText(settings['sourceFile'])[pageNumber]).find(separator) != -1:
+                logging.debug('Found separator text on page: %d' % (pageNumber+1))
+                return (pageNumber, '', {})
+        except Exception as error:
+            logging.debug('Text-searching page %d failed. Searching images only. %s' % (pageNumber+1, error))
     
-    for image in PDF.pages[0].images.keys():
-        uncroppedImage = PdfImage(PDF.pages[0].images[image]).as_pil_image()
-        width, height = uncroppedImage.size
-        cropbox=(0, 0, int(width*cropfactor), int(height*cropfactor))
-        pdfimage = uncroppedImage.crop(cropbox)  
-        uncroppedImage.close()
+    page = PDF.pages[pageIndex]
+    regions = settings.get('regions', [(0, 0, 1, 1)])
+    withPlacement = regions != [(0, 0, 1, 1)]
+    try:
+        images = pageImages(page, withPlacement)
+    except Exception as error:
+        if strict:
+            raise
+        logging.debug('Reading images of page %d failed. Search areas are applied to the images directly. %s' % (pageNumber+1, error))
+        images = pageImages(page)
+    images = imageCandidates(images, settings)
 
-        logging.debug('Extracting and analyzing an image of type %s on page %d' % (type(pdfimage),pageNumber+1))
+    if settings.get('mode', 'QR') == 'BLANK':
+        return (pageNumber, searchBlank(images, pageNumber, settings), {})
+
+    # Identical images (e.g. on digitally created separator sheets) are decoded only once per worker
+    imageVerdicts = workerCache('imageVerdicts')
+    # Verdicts of previous runs (--verdict-cache) and verdicts that will be added to the cache file
+    cacheFile = settings.get('verdictCache')
+    cachedVerdicts = workerVerdictCache(cacheFile) if cacheFile else {}
+    newVerdicts = {}
+    # Number of images that cover the search area
+    searchedImages = 0
+    
+    for image, imageObject, matrix in images:
+        # Search areas are given in page coordinates. Map them to the image.
+        imageRegions = regions
+        if matrix != None:
+            imageRegions = [imageRegion for imageRegion in (pageRegionToImage(region, page, matrix) for region in regions) if imageRegion != None]
+            if len(imageRegions) == 0:
+                logging.debug('Image %s does not cover the search area on page %d' % (image, pageNumber+1))
+                continue
+        searchedImages += 1
 
         try:             
-            barcodes = decode(pdfimage, symbols)
+            digest = imageDigest(imageObject)
+            imageKey = (digest, tuple(imageRegions))
+            if imageKey in imageVerdicts:
+                separatorCode = imageVerdicts[imageKey]
+                logging.debug('Image %s on page %d has been analyzed before' % (image, pageNumber+1))
+            else:
+                pdfImage = PdfImage(imageObject)
+                exactKey = verdictKey('exact', digest, imageRegions, settings)
+                perceptualKey = None
+                if exactKey in cachedVerdicts:
+                    separatorCode = cachedVerdicts[exactKey]
+                    logging.debug('Image %s on page %d is known from verdict cache' % (image, pageNumber+1))
+                else:
+                    # The hash is only computed if the exact key is unknown
+                    if cacheFile and settings.get('perceptualCache', False):
+                        imageHash = perceptualHash(pdfImage)
+                        if imageHash != None:
+                            perceptualKey = verdictKey('perceptual', imageHash, imageRegions, settings)
+
+                    # Only separators are reused. A small sticker on a known page does not change the hash.
+                    if cachedVerdicts.get(perceptualKey) == '':
+                        separatorCode = ''
+                        logging.debug('Image %s on page %d looks like a separator known from verdict cache' % (image, pageNumber+1))
+                    else:
+                        if settings.get('mode', 'QR') == 'PATCH':
+                            separatorCode = searchPatch(pdfImage, imageRegions, separator, pageNumber)
+                        else:
+                            separatorCode = searchImage(pdfImage, imageRegions, symbols, separator, pageNumber, settings)
+                        if cacheFile:
+                            newVerdicts[exactKey] = separatorCode
+                            # Custom postfixes can not be told apart by a perceptual hash
+                            if perceptualKey and separatorCode == '':
+                                newVerdicts[perceptualKey] = separatorCode
+                imageVerdicts[imageKey] = separatorCode
             
         except Exception as error: 
+            if strict:
+                raise
             logging.debug('Decoding barcode failed. Skipping one image on page %d - %s' % (pageNumber+1, error))
             continue
         
-        pdfimage.close()
-
-        for barcode in barcodes:
-                
-            barcodeText=str(barcode.data.decode("utf-8"))
-            logging.debug('QR-Code / Barcode containing text "%s" found on page %d. Use | as delimiter if you want to use a custom postfix' % (str(barcodeText), pageNumber+1))
-            barcodeComponents = barcodeText.split('|',1)
-            
-            if len(barcodeComponents)==2 and barcodeComponents[0] == separator:
-                separatorCode = str(barcodeComponents[1])  
-                #Do not checkfor barcodes in remaining data
-                break
-
-            elif barcodeComponents[0] == separator:
-                separatorCode = ''  
-                #Do not check for barcodes in remaining data
-                break
-
-            else:
-                logging.debug('Ignored. Reason: "%s" on page %d does not start with separator "%s". Use | as delimiter if you want to use a custom postfix' % (str(barcodeText), pageNumber+1, separator))     
-                continue
-        
-        
-
         #Skip remaining images if valid separator was found on page
         if separatorCode != None:
             break
 
-    return (pageNumber,separatorCode)
+    # Codes drawn as vector graphics (e.g. from office templates) are not part of any image
+    renderFallback = settings.get('renderFallback')
+    if separatorCode == None and (renderFallback == 'always' or (renderFallback == 'imageless' and searchedImages == 0)):
+        separatorCode = searchRendered(pageNumber, symbols, settings)
+
+    return (pageNumber,separatorCode,newVerdicts)
 
 def savePDFTextFile(PDFfile):
     '''Save text in PDF file to a text file'''
@@ -108,43 +1009,437 @@ def savePDFTextFile(PDFfile):
     logging.debug('Text file saved')
     
 
-def splitPDF(filename:str, outpath:str, separator='NEXT', mode='QR', stickerMode=False, dropName=False, workers=0, skipRewrite=False, cropfactor=1, extractText=False):
-    startSplitTime = time.time()   
-    if not skipRewrite:
-        logging.debug('Rewriting PDF %s to temporary file.' % filename)
-        tempSourceDir = TemporaryDirectory()
-        rewrittenPDF = path.join(tempSourceDir.name, "tempPDF.pdf")
- 
-        gsQuiet=''
-        #gsQuiet=' -q '
-
-        # Rewrite PDF and try to fix issues
-        # Remove images if searching for keywords, remove text if searching for QR/Barcodes
-        if mode == "KEYWORD":
-            gsFilter = ' -dFILTERIMAGE -dFILTERVECTOR '
-        else:
-            gsFilter = ' -dFILTERTEXT -dFILTERVECTOR '
-        
-        command = shlex.split("gs -o " + rewrittenPDF + gsQuiet + " -sDEVICE=pdfwrite " + gsFilter + " -dPDFSETTINGS=/default -dNEWPDF -sstdout=%stderr '" + filename + "'")
-       
-        logging.debug(command)     
-        try:  
-            subprocess.run(command) 
-            logging.debug('Rewriting completed after %d seconds.'%(int(time.time() - startSplitTime)))
-        except Exception as error:
-            logging.debug('Rewriting failed. Is Ghostscript installed and in PATH? %s' % error)
-            sys.exit("Unable to start rewrite step. Is Ghostscript installed?")
-        loadpdf = rewrittenPDF
-    else: 
-        logging.debug('Rewriting is skipped. Working with source PDF.')
-        loadpdf = filename
+def ghostscriptFilter(mode='QR'):
+    '''Remove images if searching for keywords, remove text if searching for QR/Barcodes'''
+    if mode == "KEYWORD":
+        return ' -dFILTERIMAGE -dFILTERVECTOR '
+    else:
+        return ' -dFILTERTEXT -dFILTERVECTOR '
+
+# Ghostscript library loaded into this process (--persistent-gs). -dSAFER locks the OutputFile of a running 
+# instance, so each file is rewritten by its own short-lived instance of the loaded library.
+_ghostscriptLibrary = {'module': None, 'unavailable': False}
+
+def ghostscriptLibrary():
+    '''Return the Python ghostscript bindings. They are loaded on first use. 
+    Returns None if the bindings or the Ghostscript library are not available or failed before.'''
+    if _ghostscriptLibrary['module'] != None or _ghostscriptLibrary['unavailable']:
+        return _ghostscriptLibrary['module']
+    try:
+        import ghostscript
+    except Exception as error:
+        logging.warning('The Ghostscript library is not available. Starting gs for each file. Install the Python ghostscript package to use it. %s' % error)
+        _ghostscriptLibrary['unavailable'] = True
+        return None
+    _ghostscriptLibrary['module'] = ghostscript
+    return ghostscript
+
+def rewritePDF(filename, rewrittenPDF, mode='QR', pageList=None, persistent=False):
+    '''Rewrite filename with Ghostscript to rewrittenPDF and try to fix issues. 
+    pageList is an optional list or range of page numbers (0-based) that will be rewritten instead of the whole file.
+    If persistent is True whole files are rewritten by the Ghostscript library in this process instead of a gs process.
+    Returns False if Ghostscript reported an error.'''
+    startRewriteTime = time.time()
+    logging.debug('Rewriting PDF %s to temporary file.' % filename)
+
+    if persistent and pageList == None:
+        library = ghostscriptLibrary()
+        if library != None:
+            # Files given as arguments are allowed by -dSAFER, nothing else is
+            args = ['gs', '-dSAFER', '-dBATCH', '-dNOPAUSE', '-sDEVICE=pdfwrite', '-sOutputFile=' + rewrittenPDF] + shlex.split(ghostscriptFilter(mode) + " -dPDFSETTINGS=/default -dNEWPDF -sstdout=%stderr") + [filename]
+            logging.debug('Rewriting with the Ghostscript library: %s' % args)
+            try:
+                library.Ghostscript(*args).exit()
+                logging.debug('Rewriting with the Ghostscript library completed after %d seconds.'%(int(time.time() - startRewriteTime)))
+                return True
+            except Exception as error:
+                logging.warning('Rewriting with the Ghostscript library failed. Starting gs for this and all following files. %s' % error)
+                _ghostscriptLibrary['module'] = None
+                _ghostscriptLibrary['unavailable'] = True
+
+    gsQuiet=''
+    #gsQuiet=' -q '
+
+    if isinstance(pageList, range) and pageList.step == 1:
+        gsPages = ' -dFirstPage=%d -dLastPage=%d ' % (pageList.start+1, pageList.stop)
+    elif pageList != None:
+        gsPages = ' -sPageList=' + ','.join(str(pageNumber+1) for pageNumber in pageList) + ' '
+    else:
+        gsPages = ''
     
+    command = shlex.split("gs -o '" + rewrittenPDF + "'" + gsQuiet + " -sDEVICE=pdfwrite " + ghostscriptFilter(mode) + gsPages + " -dPDFSETTINGS=/default -dNEWPDF -sstdout=%stderr") + [filename]
+   
+    logging.debug(command)     
+    try:  
+        result = subprocess.run(command) 
+        logging.debug('Rewriting completed after %d seconds.'%(int(time.time() - startRewriteTime)))
+    except Exception as error:
+        logging.debug('Rewriting failed. Is Ghostscript installed and in PATH? %s' % error)
+        sys.exit("Unable to start rewrite step. Is Ghostscript installed?")
+    if result.returncode != 0:
+        logging.warning('Ghostscript returned %d while rewriting %s.' % (result.returncode, filename))
+    return result.returncode == 0
+
+def countPages(PDFfile):
+    '''Number of pages of PDFfile, None if it can not be opened'''
     try:
-        pdf = Pdf.open(loadpdf)
+        with Pdf.open(PDFfile) as pdf:
+            return len(pdf.pages)
     except Exception as error:
-        logging.critical('Loading PDF %s failed. %s' % (loadpdf, error))
-        sys.exit("Unable to open PDF file.")
+        logging.debug('Loading PDF %s failed. %s' % (PDFfile, error))
+        return None
+
+def rewritePages(filename, tempDir, mode='QR', pageList=None, jobs=1, persistent=False):
+    '''Rewrite the pages in pageList (whole file if None) of filename to tempDir. 
+    The pages are split into page ranges that are rewritten by up to jobs Ghostscript processes in parallel.
+    Returns a list of (PDFfile, pageIndex, pageNumber) tuples that map the pages of the 
+    rewritten files to the page numbers of filename. 
+    persistent selects the in-process Ghostscript library for whole files rewritten in one piece.'''
+    if pageList == None and jobs > 1:
+        try:
+            with Pdf.open(filename) as pdf:
+                pageList = range(len(pdf.pages))
+        except Exception as error:
+            logging.debug('Counting pages of %s failed. Rewriting whole file in one piece. %s' % (filename, error))
+
+    if pageList == None or jobs <= 1 or len(pageList) < 2:
+        rewrittenPDF = path.join(tempDir, "tempPDF.pdf")
+        rewritePDF(filename, rewrittenPDF, mode, pageList, persistent)
+        pageCount = countPages(rewrittenPDF)
+        if pageCount == None:
+            logging.critical('Loading rewritten PDF %s failed.' % rewrittenPDF)
+            sys.exit("Unable to open PDF file.")
+        if pageList == None:
+            pageList = range(pageCount)
+        elif pageCount != len(pageList):
+            logging.critical('Rewriting %d pages of %s returned %d pages.' % (len(pageList), filename, pageCount))
+            sys.exit("Unable to rewrite PDF file.")
+        return [(rewrittenPDF, pageIndex, pageNumber) for pageIndex, pageNumber in enumerate(pageList)]
+
+    chunkSize = -(-len(pageList) // jobs)
+    chunks = [pageList[start:start+chunkSize] for start in range(0, len(pageList), chunkSize)]
+    logging.debug('Rewriting %d pages in %d chunks with up to %d pages' % (len(pageList), len(chunks), chunkSize))
+    
+    pages = []
+    with concurrent.futures.ThreadPoolExecutor(len(chunks)) as executor:
+        rewrittenChunks = [path.join(tempDir, "tempPDF_%04d.pdf" % chunkNumber) for chunkNumber in range(len(chunks))]
+        rewritten = [future.result() for future in [executor.submit(rewritePDF, filename, rewrittenChunks[chunkNumber], mode, chunk) for chunkNumber, chunk in enumerate(chunks)]]
+    # A failed chunk would silently drop its separators, the whole page list is rewritten in one piece instead
+    for chunkNumber, chunk in enumerate(chunks):
+        if not rewritten[chunkNumber] or countPages(rewrittenChunks[chunkNumber]) != len(chunk):
+            logging.warning('Rewriting pages %d to %d in parallel failed. Rewriting all %d pages in one piece.' % (chunk[0]+1, chunk[-1]+1, len(pageList)))
+            return rewritePages(filename, tempDir, mode, pageList, 1)
+    for rewrittenPDF, chunk in zip(rewrittenChunks, chunks):
+        pages.extend((rewrittenPDF, pageIndex, pageNumber) for pageIndex, pageNumber in enumerate(chunk))
+    return pages
+
+def peakRSS():
+    '''Peak resident set size in MiB of this process and of the largest finished child process. 
+    Child processes include the Ghostscript and pdftoppm processes, not only the pool workers.'''
+    selfRSS = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    childrenRSS = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+    # ru_maxrss is reported in KiB on Linux
+    return selfRSS / 1024, childrenRSS / 1024
 
+def segmentLength(separatorCode):
+    '''Split the length of a segment from a separator postfix like name|pages=12. 
+    Returns the postfix without the length and the number of pages (None if no length is given).'''
+    components = separatorCode.split('|')
+    if components[-1].startswith('pages='):
+        try:
+            pageCount = int(components[-1][6:])
+            if pageCount > 0:
+                return '|'.join(components[:-1]), pageCount
+        except ValueError:
+            pass
+        logging.warning('Ignoring invalid segment length "%s"' % components[-1])
+    return separatorCode, None
+
+def analyzePDF(pages, settings, max_workers, executorType='process', window=0, onConfirmed=None, pageCount=None, knownSeparators=None):
+    '''Search pages for separators in a pool of workers. 
+    pages is a list of (PDFfile, pageIndex, pageNumber) tuples: pageIndex addresses the page in PDFfile, 
+    pageNumber is the page number in the source PDF that will be reported.
+    Each worker opens each PDFfile once and analyzes the page indexes it is handed.
+    If window > 0 no more than window pages are queued at any time (streaming mode). 
+    Each page is released as soon as its result has been recorded.
+    onConfirmed(separatorPages, confirmedPages) is called whenever all pages before page number 
+    confirmedPages have been analyzed. pages have to be sorted by page number if it is used.
+    Returns the separator pages and a list of pages whose analysis failed. In strict mode 
+    failed pages are not confirmed since they will be analyzed again.
+    Separators with a segment length (NEXT|name|pages=12) let the following pages of the segment 
+    be skipped. Only the page of the expected next separator is analyzed. If there is no separator 
+    on that page, the skipped pages are analyzed after all.
+    pageCount is the number of pages of the source PDF (default: all pages are in pages) and 
+    knownSeparators are the separators of pages that are not in pages (e.g. from a first pass).'''
+    separatorPages={}
+    failedPages=[]
+    # Verdicts for the verdict cache file found by the workers
+    newVerdicts={}
+    # Pages analyzed out of order and position in pages up to which all pages have been analyzed
+    analyzed = set()
+    frontier = 0
+    # Length-encoded separators: Pages of a segment by the page number of the expected next separator,
+    # skipped pages by page number (until the expected separator is verified), pages that have not been 
+    # submitted because they are skipped and pages whose skip has been verified
+    pageInfo = {page[2]: page for page in pages}
+    if pageCount == None:
+        pageCount = len(pages)
+    if knownSeparators == None:
+        knownSeparators = {}
+    completed = set()
+    segmentSkips = {}
+    skipping = {}
+    held = set()
+    verifiedSkips = set()
+
+    if window <= 0:
+        window = len(pages)
+
+    logging.debug('Analyzing %d pages with %d %s workers, %d pages in flight' % (len(pages), max_workers, executorType, window))
+    with poolExecutor(executorType)(max_workers) as executor:
+        pageQueue = iter(pages)
+        future_page_analyzer = {}
+        page_future = {}
+
+        def submit(PDFfile, pageIndex, pageNumber):
+            future = executor.submit(analyzePageTask, PDFfile, pageIndex, pageNumber, settings)
+            future_page_analyzer[future] = pageNumber
+            page_future[pageNumber] = future
+
+        def verifySkip(expectedPage, found):
+            '''Release the pages skipped before expectedPage or analyze them if the separator was not found'''
+            if not found:
+                logging.warning('Expected separator on page %d not found. Analyzing the skipped pages.' % (expectedPage+1))
+            for pageNumber in segmentSkips.pop(expectedPage):
+                skipping.pop(pageNumber, None)
+                if found and pageNumber in held:
+                    held.discard(pageNumber)
+                    analyzed.add(pageNumber)
+                elif found:
+                    verifiedSkips.add(pageNumber)
+                elif pageNumber in held:
+                    held.discard(pageNumber)
+                    submit(*pageInfo[pageNumber])
+
+        def skipSegment(separatorPage, segmentPages):
+            '''Skip the pages of the segment that starts at separatorPage and has segmentPages pages'''
+            expectedPage = separatorPage + segmentPages + (0 if settings.get('stickerMode', False) else 1)
+            if expectedPage > pageCount:
+                logging.warning('Separator on page %d announces %d pages, but the document has only %d pages. Analyzing all pages.' % (separatorPage+1, segmentPages, pageCount))
+                return
+            segment = [pageNumber for pageNumber in range(separatorPage + 1, expectedPage) 
+                       if pageNumber in pageInfo and pageNumber not in completed and pageNumber not in skipping]
+            if not segment or expectedPage in segmentSkips:
+                return
+            logging.info('Separator on page %d announces %d pages. Skipping to page %d.' % (separatorPage+1, segmentPages, expectedPage+1))
+            for pageNumber in segment:
+                skipping[pageNumber] = expectedPage
+                future = page_future.get(pageNumber)
+                if future != None and future.cancel():
+                    del future_page_analyzer[future]
+                    del page_future[pageNumber]
+                    held.add(pageNumber)
+            segmentSkips[expectedPage] = segment
+            # Nothing to verify at the end of the document, pages that are not in pages have a known verdict
+            if expectedPage == pageCount:
+                verifySkip(expectedPage, True)
+            elif expectedPage in completed:
+                verifySkip(expectedPage, expectedPage in separatorPages)
+            elif expectedPage not in pageInfo:
+                verifySkip(expectedPage, expectedPage in knownSeparators)
+
+        while True:
+            # Refill the window
+            for PDFfile, pageIndex, pageNumber in pageQueue:
+                if pageNumber in verifiedSkips:
+                    analyzed.add(pageNumber)
+                    continue
+                if pageNumber in skipping:
+                    held.add(pageNumber)
+                    continue
+                submit(PDFfile, pageIndex, pageNumber)
+                if len(future_page_analyzer) >= window:
+                    break
+            
+            if not future_page_analyzer:
+                break
+
+            done, _ = concurrent.futures.wait(future_page_analyzer, return_when=concurrent.futures.FIRST_COMPLETED)
+            for future in done:
+                pageNumber = future_page_analyzer.pop(future)
+                del page_future[pageNumber]
+                try:
+                    result = future.result()
+                    newVerdicts.update(result[2])
+                    completed.add(pageNumber)
+                    if result[1] != None:
+                        separatorPages[result[0]], segmentPages = segmentLength(result[1])
+                        if segmentPages != None:
+                            skipSegment(pageNumber, segmentPages)
+                    if pageNumber in segmentSkips:
+                        verifySkip(pageNumber, result[1] != None)
+
+                except Exception as exc:
+                    logging.debug('Analyzing page %d generated an exception: %s' % (pageNumber+1, exc))
+                    failedPages.append(pageNumber)
+                    if pageNumber in segmentSkips:
+                        verifySkip(pageNumber, False)
+                    if settings.get('strict', False):
+                        continue
+                analyzed.add(pageNumber)
+
+            if onConfirmed != None:
+                previousFrontier = frontier
+                while frontier < len(pages) and pages[frontier][2] in analyzed:
+                    analyzed.discard(pages[frontier][2])
+                    frontier += 1
+                if frontier != previousFrontier:
+                    onConfirmed(separatorPages, pages[frontier][2] if frontier < len(pages) else float('inf'))
+
+    logging.debug('Peak RSS after analysis: %.1f MiB main process, %.1f MiB largest child process (workers, gs)' % peakRSS())
+    if settings.get('verdictCache'):
+        saveVerdictCache(settings['verdictCache'], newVerdicts)
+    return separatorPages, sorted(failedPages)
+
+def newSegmentWriter(filename, outpath, sourceName, stickerMode=False, extractText=False, saveWorkers=1, executorType='process'):
+    '''State of the assembly of split PDFs. Separators are handed over in page order 
+    by confirmSegments(). Each segment is saved as soon as the separator that closes it is confirmed.'''
+    return {
+        'filename': filename,
+        'outpath': outpath,
+        'sourceName': sourceName,
+        'stickerMode': stickerMode,
+        'extractText': extractText,
+        # Pages are copied from original PDF. It will be opened when the first separator is confirmed
+        'sourcePDF': None,
+        # Page number and postfix of the last confirmed separator
+        'lastSeparator': None,
+        'separatorCount': 0,
+        # First page of the current segment in "Separator Page Mode"
+        'startPage': 0,
+        # Filenames of all saved segments
+        'fileList': [],
+        # Segments are assembled and saved concurrently by a pool of saveWorkers workers
+        'saveWorkers': saveWorkers,
+        'executorType': executorType,
+        'saveExecutor': None,
+        'saveJobs': {}
+    }
+
+def saveSegmentTask(filename, pageRange, saveAs, extractText=False):
+    '''Worker entry point: Copy pageRange from the source PDF filename to a new PDF and save it as saveAs'''
+    sourcePDF = workerPDF(filename)
+    splitPDF = Pdf.new()
+    for includePage in pageRange:
+        logging.debug('Adding source page %d to new PDF' % (includePage+1))
+        splitPDF.pages.append(sourcePDF.pages[includePage])  
+    
+    try:
+        splitPDF.save(saveAs)
+        splitPDF.close() 
+    except Exception as e:
+        logging.critical('Saving split PDF %s failed. %s' % (saveAs, e))
+        return
+
+    try:                
+        if extractText==True:
+            savePDFTextFile (saveAs)
+    except Exception as e:
+        logging.critical('Saving raw text of split PDF %s failed. %s' % (saveAs, e))
+
+def saveSegment(writer, pageRange, filenamePostfix):
+    '''Hand the segment over to the pool of save workers'''
+    saveAs = path.join(writer['outpath'] , str(writer['sourceName']) + str(filenamePostfix) + '.pdf')
+    logging.info('Saving PDF: %s' % (saveAs))
+    writer['fileList'].append(saveAs)
+
+    if writer['saveExecutor'] == None:
+        logging.debug('Saving split PDFs with %d %s workers' % (writer['saveWorkers'], writer['executorType']))
+        writer['saveExecutor'] = poolExecutor(writer['executorType'])(writer['saveWorkers'])
+
+    writer['saveJobs'][writer['saveExecutor'].submit(saveSegmentTask, writer['filename'], pageRange, saveAs, writer['extractText'])] = saveAs
+
+def closeSegment(writer, endPage):
+    '''Save the segment that ends before endPage'''
+    #Separator pages start new segment and will be kept 
+    if writer['stickerMode'] == True:
+        #Pages before the first separator are not part of any segment
+        if writer['lastSeparator'] == None:
+            return
+        startPage, filenamePostfix = writer['lastSeparator']
+        #is either part of QR-Code or index number
+        if filenamePostfix=='':
+            filenamePostfix = "%04d"% (writer['separatorCount']) 
+        saveSegment(writer, range(startPage, endPage), filenamePostfix)
+
+    #Separator pages are dropped    
+    else:
+        filenamePostfix= "%04d" % (writer['separatorCount']+1)
+        if endPage > writer['startPage']:
+            saveSegment(writer, range(writer['startPage'], endPage), filenamePostfix)
+        else:
+            logging.debug('Segment %s has no pages. Separator on first page, last page or on consecutive pages?'% (str(filenamePostfix)))
+
+def confirmSegments(writer, separatorPages, confirmedPages):
+    '''All pages before page number confirmedPages have been analyzed. 
+    Save all segments that are closed by a separator on these pages.'''
+    if writer['lastSeparator'] == None:
+        lastSeparatorPage = -1
+    else:
+        lastSeparatorPage = writer['lastSeparator'][0]
+
+    for pageNumber in sorted(separatorPages.keys()):
+        if pageNumber <= lastSeparatorPage:
+            continue
+        if pageNumber >= confirmedPages:
+            break
+
+        if writer['sourcePDF'] == None:
+            logging.debug('Pages will be copied from original PDF. Assembling PDFs in "%s"' % ('Sticker Mode' if writer['stickerMode'] else 'Separator Page Mode'))   
+            try:
+                writer['sourcePDF'] = Pdf.open(writer['filename'])
+            except:
+                logging.critical('Loading of PDF %s failed.' % writer['filename'])
+                sys.exit("Unable to open PDF file.")
+
+        closeSegment(writer, pageNumber)
+        writer['separatorCount'] += 1
+        writer['lastSeparator'] = (pageNumber, str(separatorPages[pageNumber]))
+        writer['startPage'] = pageNumber + 1
+
+def finishSegments(writer):
+    '''Save the last segment. It ends with the last page of the source PDF. 
+    Returns the list of saved files.'''
+    if writer['sourcePDF'] != None:
+        closeSegment(writer, len(writer['sourcePDF'].pages))
+        writer['sourcePDF'].close()
+        writer['sourcePDF'] = None
+
+    if writer['saveExecutor'] != None:
+        for future in concurrent.futures.as_completed(writer['saveJobs']):
+            try:
+                future.result()
+            except Exception as exc:
+                logging.critical('Saving split PDF %s failed. %s' % (writer['saveJobs'][future], exc))
+        writer['saveExecutor'].shutdown()
+        writer['saveExecutor'] = None
+        writer['saveJobs'].clear()
+    return writer['fileList']
+
+def splitPDF(filename:str, outpath:str, separator='NEXT', mode='QR', stickerMode=False, dropName=False, workers=0, skipRewrite=False, cropfactor=1, extractText=False, *, executorType='process', window=0, streamOutput=False, saveWorkers=0, adaptiveRewrite=False, rewriteJobs=1, persistentGS=False, coarseScale=1, regions=None, verdictCache=None, perceptualCache=False, minImageSize=21, qrPrefilter=False, tileSize=0, tileThreads=1, symbologies=None, scanDensity=(1, 1), decoder='pyzbar', renderFallback=None, renderDPI=100, blankInk=0.3, blankDeviation=25, blankMargin=0.05):
+    startSplitTime = time.time()   
+    tempSourceDir = TemporaryDirectory()
+    # Pages to analyze as (PDFfile, pageIndex, pageNumber) tuples
+    analysisPages = None
+    if mode == 'KEYWORD':
+        logging.debug('Keyword search works with the text layer of the source PDF. Rewriting is skipped.')
+    elif not skipRewrite and not adaptiveRewrite:
+        analysisPages = rewritePages(filename, tempSourceDir.name, mode, None, rewriteJobs, persistentGS)
+    elif adaptiveRewrite and not skipRewrite:
+        logging.debug('Adaptive rewrite: Analyzing source PDF directly. Pages that fail will be rewritten.')
+    else: 
+        logging.debug('Rewriting is skipped. Working with source PDF.')
+    
     if not outpath:
         outpath=path.dirname(filename)
 
@@ -160,150 +1455,78 @@ def splitPDF(filename:str, outpath:str, separator='NEXT', mode='QR', stickerMode
     if workers > 0:
         max_workers = workers
     else:
-        max_workers = cpu_count() - 1
+        max_workers = max(1, cpu_count() - 1)
+
+    if saveWorkers <= 0:
+        saveWorkers = max_workers
+
+    writer = newSegmentWriter(filename, outpath, sourceName, stickerMode, extractText, saveWorkers, executorType)
+
+    if streamOutput:
+        # Write segments as soon as all pages up to their closing separator are analyzed
+        onConfirmed = lambda separatorPages, confirmedPages: confirmSegments(writer, separatorPages, confirmedPages)
+    else:
+        onConfirmed = None
 
     if mode != 'KEYWORD':
         # let's see how quick we can analyze the pages in multiprocessing/threading
         startAnalysisTime = time.time()
         logging.debug('Extracting images and searching for QR-Codes / Barcodes')
 
-        pageCollection=[]
-        #creating single page PDFs since passing a page directly raises a pickle exception / images can not be accessed :(
-        for page in pdf.pages:
-            tempPDF = Pdf.new()
-            tempPDF.pages.append(page)
-            pageCollection.append(tempPDF)
-        pdf.close()
-
-        logging.debug('Analyzing pages with %d workers' % (max_workers))
-        with concurrent.futures.ThreadPoolExecutor(max_workers) as executor:
-            future_page_analyzer = {executor.submit(analyzePage, pageCollection[pageNumber], pageNumber, separator, mode, cropfactor): pageNumber for pageNumber in range(len(pdf.pages))}
-            for future in concurrent.futures.as_completed(future_page_analyzer):
-                thread = future_page_analyzer[future]
-                try:
-                    if future.result()[1] != None:
-                        separatorPages[future.result()[0]]=future.result()[1]
+        if analysisPages == None:
+            # Only the page count is needed here, the workers open the PDF themselves
+            try:
+                with Pdf.open(filename) as pdf:
+                    analysisPages = [(filename, pageNumber, pageNumber) for pageNumber in range(len(pdf.pages))]
+            except Exception as error:
+                logging.critical('Loading PDF %s failed. %s' % (filename, error))
+                sys.exit("Unable to open PDF file.")
+        pageCount = len(analysisPages)
 
-                except Exception as exc:
-                    logging.debug('Thread %r generated an exception: %s' % (thread, exc))
-        
-        logging.debug('Analysis completed: %d separators found on %d pages. This step took about %d seconds'%(len(separatorPages),len(pdf.pages), int(time.time() - startAnalysisTime)))
+        if not regions:
+            # -af limits the search area to the upper left corner
+            regions = [(0, 0, cropfactor, cropfactor)]
+        settings = {'separator': separator, 'mode': mode, 'regions': regions, 'strict': adaptiveRewrite and not skipRewrite, 'coarseScale': coarseScale, 'verdictCache': verdictCache, 'perceptualCache': perceptualCache, 'minImageSize': minImageSize, 'qrPrefilter': qrPrefilter, 'tileSize': tileSize, 'tileThreads': tileThreads, 'symbologies': symbologies, 'scanDensity': scanDensity, 'decoder': decoder, 'renderFallback': renderFallback, 'renderDPI': renderDPI, 'sourceFile': filename, 'blankInk': blankInk, 'blankDeviation': blankDeviation, 'blankMargin': blankMargin, 'stickerMode': stickerMode}
+        separatorPages, failedPages = analyzePDF(analysisPages, settings, max_workers, executorType, window, onConfirmed)
         
-        pageCollection.clear()
+        if settings['strict']:
+            logging.info('Adaptive rewrite: Direct analysis of %d pages took about %d seconds, %d pages failed.' % (pageCount, int(time.time() - startAnalysisTime), len(failedPages)))
 
-    else:   
-        separatorPages = searchPDF (filename, separator)
+        if settings['strict'] and len(failedPages) > 0:
+            startRewriteTime = time.time()
+            # Rewriting a few pages is cheaper than rewriting the whole file
+            if len(failedPages) > pageCount / 2:
+                logging.info('Adaptive rewrite: Rewriting whole file.')
+                retryPages = [page for page in rewritePages(filename, tempSourceDir.name, mode, None, rewriteJobs, persistentGS) if page[2] in failedPages]
+            else:
+                logging.info('Adaptive rewrite: Rewriting failed pages %s.' % ', '.join(str(pageNumber+1) for pageNumber in failedPages))
+                retryPages = rewritePages(filename, tempSourceDir.name, mode, failedPages, rewriteJobs)
+            logging.info('Adaptive rewrite: Rewriting took about %d seconds.' % int(time.time() - startRewriteTime))
 
-    # All filenames created while splitting go here
-    fileList=[]
+            startRetryTime = time.time()
+            settings['strict'] = False
+            retryConfirmed = None
+            if onConfirmed != None:
+                # Segments are closed by the separators of both passes
+                firstPassSeparators = separatorPages
+                retryConfirmed = lambda retrySeparators, confirmedPages: onConfirmed({**firstPassSeparators, **retrySeparators}, confirmedPages)
+            retrySeparators, failedPages = analyzePDF(retryPages, settings, max_workers, executorType, window, retryConfirmed, pageCount, separatorPages)
+            separatorPages.update(retrySeparators)
+            logging.info('Adaptive rewrite: Analysis of %d rewritten pages took about %d seconds.' % (len(retryPages), int(time.time() - startRetryTime)))
+        elif settings['strict']:
+            logging.info('Adaptive rewrite: Ghostscript rewrite was not needed.')
 
-    if len(separatorPages)>0:
-        logging.debug('Pages will be copied from original PDF.')   
-        
-        try:
-            sourcePDF = Pdf.open(filename)
-        except:
-            logging.critical('Loading of PDF %s failed.' % filename)
-            sys.exit("Unable to open PDF file.")
-    
-        #Separator pages start new segment and will be kept 
-        if stickerMode == True:
-            logging.debug('Assembling PDFs in "Sticker Mode"')
-            pageList=sorted(separatorPages.keys())
-            for x in range (0,len(pageList)):
-                
-                startPage=pageList[x]
-
-                if x == len(pageList)-1:
-                    #Last segment ends with last page of PDF
-                    endPage=len(sourcePDF.pages) 
-                else:
-                    #Stop segment one Page before another QR-Code was found
-                    endPage=pageList[x+1]
-                    
-                splitPDF = Pdf.new()
-
-                #is either part of QR-Code or index number
-                filenamePostfix=str(separatorPages[pageList[x]])
-                if filenamePostfix=='':
-                    filenamePostfix = "%04d"% (x+1) 
-
-                pageRange = range (startPage, endPage)
-                for includePage in pageRange:
-                    logging.debug('Adding source page %d to new PDF' % (includePage+1))
-                    splitPDF.pages.append(sourcePDF.pages[includePage])  
-                saveAs = path.join(outpath , str(sourceName) + str(filenamePostfix) + '.pdf')
-                logging.debug('Saving PDF: %s' % (saveAs))
-                fileList.append(saveAs)
-                try:
-                    splitPDF.save(saveAs)
-                    splitPDF.close()
-                except Exception as e:
-                    logging.critical('Saving split PDF %s failed. %s' % (saveAs, e))
-                    continue
-                
-                try:                
-                        if extractText==True:
-                            savePDFTextFile (saveAs)
-                except Exception as e:
-                    logging.critical('Saving PDF %s failed. %s' % (saveAs, e))
-                    continue
-                          
-        #Separator pages are dropped    
-        else:
-            logging.debug('Assembling PDFs in "Separator Page Mode"')
-            startPage=0
-            pageList=sorted(separatorPages.keys())
+        logging.debug('Analysis completed: %d separators found on %d pages. This step took about %d seconds'%(len(separatorPages), pageCount, int(time.time() - startAnalysisTime)))
 
-            #Multithreading candidate??
-            for x in range (0,len(pageList)+1): 
-
-                if x == len(pageList):
-                    #Last segment ends with last page of PDF
-                    endPage=len(sourcePDF.pages) 
-                else:
-                    #Stop at page before separator was found
-                    endPage=pageList[x]
-                splitPDF = Pdf.new()
-
-                filenamePostfix= "%04d" % (x+1)
-                
-                hasPages = False
-
-                pageRange = range (startPage, endPage)
-                for includePage in pageRange:
-                    logging.debug('Adding source page %d to new PDF' % (includePage+1))
-                    splitPDF.pages.append(sourcePDF.pages[includePage])  
-                    hasPages = True
-                if hasPages:
-                    saveAs = path.join(outpath , str(sourceName) + str(filenamePostfix) + '.pdf')
-                    logging.info('Saving PDF: %s' % (saveAs))
-                    fileList.append(saveAs)
-                    try:
-                        splitPDF.save(saveAs)
-                        splitPDF.close() 
-                    except Exception as e:
-                        logging.critical('Saving raw text of split PDF %s failed. %s' % (saveAs, e))
-                        continue
+    else:   
+        separatorPages = searchPDF (filename, separator, max_workers, executorType, window, onConfirmed)
 
-                    try:                
-                        if extractText==True:
-                            savePDFTextFile (saveAs)
-                    except Exception as e:
-                        logging.critical('Saving raw text of split PDF %s failed. %s' % (saveAs, e))
-                        continue
-                    
-                    
-                    
-                else:
-                    logging.debug('Segment %s has no pages. Separator on first page, last page or on consecutive pages?'% (str(filenamePostfix)))
-                
-                
-                startPage=endPage+1
+    # Save segments that are not written yet
+    confirmSegments(writer, separatorPages, float('inf'))
+    fileList = finishSegments(writer)
+    if len(fileList) > 0:
         logging.info('Finished splitting %s in: %d seconds.'%(filename, int(time.time() - startSplitTime)))
         
-        sourcePDF.close()
-        
     if len(fileList) == 0:
         saveAs = path.join(outpath , path.basename(filename))
         try: 
@@ -323,6 +1546,73 @@ def splitPDF(filename:str, outpath:str, separator='NEXT', mode='QR', stickerMode
     return fileList
          
    
+def sampleImages(samples):
+    '''Greyscale images of the sample files: all images of the PDF files and the image files 
+    (PNG, JPEG, TIFF) in the sample folders / files. Yields (name, image) one image at a time.'''
+    files = []
+    for sample in samples:
+        if path.isdir(sample):
+            for folder, subfolders, filenames in walk(sample):
+                files.extend(path.join(folder, filename) for filename in sorted(filenames))
+        else:
+            files.append(sample)
+
+    for file in files:
+        extension = path.splitext(file)[1].lower()
+        try:
+            if extension == '.pdf':
+                with Pdf.open(file) as PDF:
+                    for pageNumber, page in enumerate(PDF.pages):
+                        for name, image, matrix in pageImages(page):
+                            try:
+                                sample = extractImage(PdfImage(image))
+                            except Exception as error:
+                                logging.warning('Skipping image %s on page %d of %s: %s' % (name, pageNumber+1, file, error))
+                                continue
+                            yield ('%s page %d %s' % (file, pageNumber+1, name), sample)
+            elif extension in ('.png', '.jpg', '.jpeg', '.tif', '.tiff'):
+                with Image.open(file) as image:
+                    sample = image.convert('L')
+                yield (file, sample)
+        except Exception as error:
+            logging.warning('Skipping sample %s: %s' % (file, error))
+
+def benchmarkDecoders(samples, decoders, settings):
+    '''Decode the images of the sample files / folders with each decoder and report throughput and recall.
+    Recall is measured against the images in which any of the decoders found a separator.
+    Only one image is kept in memory, it is decoded by every decoder before the next one is loaded.'''
+    symbols = modeSymbols(settings)
+    separator = settings.get('separator', 'NEXT')
+    decoderSettings = {decoder: dict(settings, decoder=decoder) for decoder in decoders}
+
+    names = []
+    hits = {decoder: set() for decoder in decoders}
+    seconds = dict.fromkeys(decoders, 0.0)
+    for index, (name, image) in enumerate(sampleImages(samples)):
+        names.append(name)
+        for decoder in decoders:
+            startTime = time.time()
+            found = matchSeparator(decodeImage(image, symbols, decoderSettings[decoder]), separator, index) != None
+            seconds[decoder] += time.time() - startTime
+            if found:
+                logging.debug('%s: separator in %s' % (decoder, name))
+                hits[decoder].add(index)
+    if not names:
+        logging.critical('No sample images found in %s' % ', '.join(samples))
+        return {}
+    results = {decoder: (hits[decoder], seconds[decoder]) for decoder in decoders}
+
+    # Images that are only found by some decoders are the interesting ones
+    reference = set().union(*hits.values())
+    print('%d sample images, %d with a separator found by any decoder' % (len(names), len(reference)))
+    print('%-8s %10s %10s %12s %8s' % ('Decoder', 'Seconds', 'Images/s', 'Separators', 'Recall'))
+    for decoder, (decoderHits, decoderSeconds) in results.items():
+        recall = 100.0 * len(decoderHits) / len(reference) if reference else 100.0
+        print('%-8s %10.2f %10.1f %12d %7.1f%%' % (decoder, decoderSeconds, len(names) / max(decoderSeconds, 1e-9), len(decoderHits), recall))
+        for index in sorted(reference - decoderHits):
+            print('    missed: %s' % names[index])
+    return results
+
 if __name__ == "__main__":
    
     parser = argparse.ArgumentParser(description="""Split a PDF-file into separate files based on a separator QR-Code / barcode / keyword. 
@@ -341,8 +1631,8 @@ Examples:
 If you use Sticker Mode without a custom prefix segment numbers will be added
 to the filename.""")
 
-    parser.add_argument('filename', metavar='/path/to/inputfile.pdf', type=str,
-                    help='Filename of PDF')
+    parser.add_argument('filename', metavar='/path/to/inputfile.pdf', type=str, nargs='+',
+                    help='Filename of PDF. Several files can be split in one batch.')
     parser.add_argument('-d', '--drop-filename', action='store_true',
                     help='Do not use input filename for output filename')
     parser.add_argument('-s', '--separator', type=str, default="NEXT",
@@ -351,12 +1641,60 @@ to the filename.""")
                         help='New PDF-Seqment starts at QR-Code (Page will be kept). Add custom postfix to barcode content by using | as delimiter')
     parser.add_argument('-w', '--workers', type=int, default=0,
                         help='Number of process workers. Default is CPU cores - 1.')
+    parser.add_argument('-sw', '--save-workers', type=int, default=0,
+                        help='Number of workers assembling and saving the split PDFs. Default is the number of analysis workers.')
+    parser.add_argument('-e', '--executor', default="process", choices=['process', 'thread'],
+                        help='Run page analysis and saving in worker processes (default) or threads.')
+    parser.add_argument('--window', type=int, default=0,
+                        help='Streaming analysis: Limit the number of pages queued for analysis to keep memory usage constant for very large files. Default: 0 (queue all pages).')
+    parser.add_argument('--stream-output', action='store_true',
+                        help='Save each split PDF as soon as all its pages are analyzed instead of waiting for the analysis of the whole file.')
     parser.add_argument('-sr', '--skip-rewrite', action='store_true',
-                        help='Skip rewrite / preparation step and work with unaltered source PDF.')
-    parser.add_argument('-m,', '--mode',  default="QR", choices=['QR', 'BARCODE', 'KEYWORD'],
-                        help='Select used separator: QR (default), BARCODE, KEYWORD')
+                        help='Skip rewrite / preparation step and work with unaltered source PDF. KEYWORD mode never rewrites.')
+    parser.add_argument('-rj', '--rewrite-jobs', type=int, default=1,
+                        help='Split the rewrite step into page ranges that are rewritten by this number of parallel Ghostscript processes. Default: 1')
+    parser.add_argument('-pg', '--persistent-gs', action='store_true',
+                        help='Rewrite whole files with the Ghostscript library loaded once into this process instead of starting a gs process for each file. Needs the Python ghostscript package.')
+    parser.add_argument('-ar', '--adaptive-rewrite', action='store_true',
+                        help='Analyze the unaltered source PDF first and rewrite only pages that can not be analyzed.')
+    parser.add_argument('-m,', '--mode',  default="QR", choices=['QR', 'BARCODE', 'KEYWORD', 'PATCH', 'BLANK', 'ANY'],
+                        help='Select used separator: QR (default), BARCODE, KEYWORD, PATCH (Kodak patch code sheets, the separator is a list of patch codes like T,2. Default: T and 2), BLANK (blank pages, the separator is ignored), ANY (KEYWORD first, QR codes / the barcodes given by --symbologies on pages without keyword)')
+    parser.add_argument('--symbologies', type=symbologyList, default=None,
+                        help='BARCODE mode: comma separated list of symbologies to decode, e.g. CODE128,CODE39. Every additional symbology costs time and may find product barcodes. Default: all')
+    parser.add_argument('-zd', '--scan-density', type=densityValues, default=(1, 1),
+                        help='zbar scan density X,Y (or one value for both): only every Xth column and Yth row is scanned. Larger values are faster but may miss small codes. Default: 1,1')
+    parser.add_argument('--decoder', default='pyzbar', choices=list(decoderBackends),
+                        help='Decoder for QR codes / barcodes: pyzbar (default), zxing (needs zxing-cpp) or opencv (needs opencv-python-headless, QR mode only). --scan-density only applies to pyzbar.')
+    parser.add_argument('--benchmark', action='store_true',
+                        help='Do not split. Decode all images in the given PDF / image files and folders with every available decoder and report throughput and recall.')
+    parser.add_argument('-rf', '--render-fallback', choices=['imageless', 'always'],
+                        help='Render the search areas of the source page at low resolution and decode them if no separator was found in the images of the page. Finds codes drawn as vector graphics. imageless: only pages without images in the search area, always: all pages without separator. Uses pdftoppm if installed, Ghostscript otherwise. Default: off')
+    parser.add_argument('--render-dpi', type=int, default=100,
+                        help='Resolution for --render-fallback. Default: 100')
+    parser.add_argument('--blank-ink', type=float, default=0.3,
+                        help='BLANK mode: A page is blank if ink covers at most this percentage of the page without margins. Default: 0.3')
+    parser.add_argument('--blank-deviation', type=float, default=25,
+                        help='BLANK mode: A page is blank if the standard deviation of its grey levels (0-255) is at most this value. Default: 25')
+    parser.add_argument('--blank-margin', type=float, default=0.05,
+                        help='BLANK mode: Ignore this fraction of the width / height at each edge of the page (scanner shadows, punch holes). Default: 0.05')
     parser.add_argument('-af', '--area-factor', type=float, choices=[(1 * x / 4 ) for x in range(1, 5)], default=1.0,
                         help='Speed up QR/Barcode search by limiting search area. Origin is top left corner. Default is 1.0 (whole page). E.g. 0.5 is upper left quadrant.')
+    parser.add_argument('-r', '--region', type=searchRegion, action='append',
+                        help='Search area LEFT,TOP,RIGHT,BOTTOM as fractions of the page as it is displayed, origin is top left corner. Page rotation and image placement are taken into account. Can be used several times, the areas are searched in this order until a separator is found. E.g. 0.8,0,1,0.2 is the upper right 20%%, 0,0.9,1,1 is a strip at the bottom. Replaces --area-factor.')
+    parser.add_argument('-cs', '--coarse-scale', type=float, default=1.0,
+                        help='Speed up QR/Barcode search by decoding at this scale first, e.g. 0.33. In QR mode full resolution is only decoded if nothing was found and the search area has a QR finder pattern at this scale (a module of the code needs about two pixels at this scale). In the other modes full resolution is decoded for every page that is not blank, so this only pays off if most pages are separators. Default is 1.0 (full resolution only).')
+    parser.add_argument('-qp', '--qr-prefilter', action='store_true',
+                        help='QR mode only: Decode only search areas that contain the finder pattern of a QR code. A fast check that skips decoding of ordinary text pages.')
+    parser.add_argument('--tile-size', type=int, default=0,
+                        help='Split large search areas into overlapping tiles of this size in pixels and stop at the first tile with a separator. Overlap is a quarter of the tile size. Default: 0 (no tiles)')
+    parser.add_argument('--tile-threads', type=int, default=1,
+                        help='Number of threads decoding the tiles of a page in parallel. Default: 1')
+    parser.add_argument('--min-image-size', type=int, default=21,
+                        help='Skip images that are smaller than this number of pixels (short side in QR mode, long side in BARCODE mode) without decoding them. Default: 21')
+    parser.add_argument('--verdict-cache', metavar='/path/to/cache.json', type=str,
+                        help='Remember images identified as separators or non-separators in this file. Identical images get their verdict without decoding in later runs.')
+    parser.add_argument('--perceptual-cache', action='store_true',
+                        help='Also match scans of known separator pages by a perceptual hash in the verdict cache. Only separators without custom postfix in JPEG images are reused this way, other pages are always decoded. Sheets that are almost blank, e.g. with a small code on a white page, are never matched.')
     parser.add_argument('-t', '--extract-text', action='store_true',
                     help='Save text in separate text file')
     parser.add_argument('-o', '--output-folder', metavar='/path/to/output/folder', type=str, 
@@ -373,5 +1711,26 @@ to the filename.""")
     else:
         raise ValueError('Invalid log level: %s' % loglevel)
         
-    for file in splitPDF (args.filename, args.output_folder, args.separator, args.mode, args.sticker_mode, args.drop_filename, args.workers, args.skip_rewrite, args.area_factor, args.extract_text):
-        print(file)
+    if args.benchmark:
+        settings = {'separator': args.separator, 'mode': args.mode, 'symbologies': args.symbologies, 'scanDensity': args.scan_density}
+        benchmarkDecoders(args.filename, [decoder for decoder in decoderBackends if decoderAvailable(decoder, args.mode, args.symbologies)], settings)
+        sys.exit()
+
+    if args.mode == 'PATCH':
+        try:
+            patchSeparators(args.separator)
+        except ValueError as error:
+            parser.error(str(error))
+    elif args.mode in ('QR', 'BARCODE', 'ANY') and not decoderAvailable(args.decoder, args.mode, args.symbologies):
+        parser.error('decoder %s can not be used' % args.decoder)
+
+    for filename in args.filename:
+        for file in splitPDF (filename, args.output_folder, args.separator, args.mode, args.sticker_mode, args.drop_filename, args.workers, args.skip_rewrite, args.area_factor, args.extract_text,
+                              executorType=args.executor, window=args.window, streamOutput=args.stream_output, saveWorkers=args.save_workers,
+                              adaptiveRewrite=args.adaptive_rewrite, rewriteJobs=args.rewrite_jobs, persistentGS=args.persistent_gs,
+                              coarseScale=args.coarse_scale, regions=args.region, verdictCache=args.verdict_cache, perceptualCache=args.perceptual_cache,
+                              minImageSize=args.min_image_size, qrPrefilter=args.qr_prefilter, tileSize=args.tile_size, tileThreads=args.tile_threads,
+                              symbologies=args.symbologies, scanDensity=args.scan_density, decoder=args.decoder, renderFallback=args.render_fallback,
+                              renderDPI=args.render_dpi, blankInk=args.blank_ink, blankDeviation=args.blank_deviation, blankMargin=args.blank_margin):
+            print(file)
+